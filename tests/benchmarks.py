@@ -0,0 +1,300 @@
+from timeit import timeit
+from typing import Callable
+import tracemalloc
+from collections import deque
+from array import array
+import tempfile
+import json
+import yaml
+import sys
+import os
+
+from wrappers.common_wrapper import CommonWrapper, SerializationEngine
+from visual import TagType
+from views.serial_view import SerialView
+from views.formatted_view import FormattedView
+from views.table_view import TableView
+from views.columnar_table_view import ColumnarTableView, ColumnFormat
+from viewers.tree_viewer import TreeViewer
+from viewers.table_viewer import TableViewer
+from util.serial_backends import SERIAL_BACKENDS
+from examples.da_knowledge import linked_terms
+
+REPEATS = 5
+
+
+def get_wide_tree(width: int = 10, depth: int = 4) -> dict:
+    if depth == 0:
+        return dict(name='leaf', value=1.5, flag=True)
+    return {f'item{n}': get_wide_tree(width, depth - 1) for n in range(width)}
+
+
+def get_deep_chain(depth: int = 500) -> dict:
+    chain = dict(value=0)
+    for n in range(depth):
+        chain = dict(value=n, next=chain)
+    return chain
+
+
+def print_time(title: str, func: Callable, repeats: int = REPEATS):
+    try:
+        seconds = timeit(func, number=repeats) / repeats
+    except RecursionError:
+        print(f'{title}: RecursionError')
+    else:
+        print(f'{title}: {seconds * 1000:.1f} ms')
+
+
+def print_peak_memory(title: str, func: Callable):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{title}: peak {peak / 1024 / 1024:.1f} MB')
+
+
+def bench_serialization_engines():
+    payloads = dict(
+        wide_tree=get_wide_tree(),
+        chain=get_deep_chain(depth=200),
+        deep_chain=get_deep_chain(depth=5000),
+        linked_terms=linked_terms.psm,
+    )
+    for engine in SerializationEngine:
+        CommonWrapper.set_serialization_engine(engine)
+        for name, obj in payloads.items():
+            depth = 5 if name == 'linked_terms' else None
+            wrapped = CommonWrapper(obj)
+            print_time(f'{engine.value} {name}', lambda: wrapped.get_serializable_props(depth=depth))
+    CommonWrapper.set_serialization_engine(SerializationEngine.Recursive)
+
+
+def bench_json_streaming():
+    view = SerialView(get_wide_tree(width=12, depth=4))
+    with open(os.devnull, 'w') as devnull:
+        print_time('get_json', lambda: devnull.write(view.get_json()), repeats=1)
+        print_time('write_json', lambda: view.write_json(devnull), repeats=1)
+        print_peak_memory('get_json', lambda: devnull.write(view.get_json()))
+        print_peak_memory('write_json', lambda: view.write_json(devnull))
+
+
+def bench_yaml_streaming():
+    view = SerialView(get_wide_tree(width=12, depth=4))
+    with open(os.devnull, 'w') as devnull:
+        print_time('get_yaml', lambda: devnull.write(view.get_yaml()), repeats=1)
+        print_time('write_yaml', lambda: view.write_yaml(devnull), repeats=1)
+        print_time('write_yaml(fast=True)', lambda: view.write_yaml(devnull, fast=True), repeats=1)
+        print_peak_memory('get_yaml', lambda: devnull.write(view.get_yaml()))
+        print_peak_memory('write_yaml', lambda: view.write_yaml(devnull))
+
+
+def bench_stream_parsing(count: int = 100000, batch_size: int = 1000):
+    records = [dict(n=n, name=f'record {n}', tags=['a', 'b']) for n in range(count)]
+    with tempfile.TemporaryDirectory() as folder:
+        files = dict(jsonl=os.path.join(folder, 'records.jsonl'), yaml=os.path.join(folder, 'records.yaml'))
+        with open(files['jsonl'], 'w') as fp:
+            fp.writelines(json.dumps(i) + '\n' for i in records)
+        with open(files['yaml'], 'w') as fp:
+            yaml.safe_dump_all(records[:count // 10], fp)
+        del records
+        for serial_format, file_path in files.items():
+            parser = getattr(SerialView, f'parse_{serial_format}_stream')
+            print_time(f'parse_{serial_format}_stream', lambda: deque(parser(file_path), maxlen=0), repeats=1)
+            print_peak_memory(
+                f'parse_{serial_format}_stream(batch_size={batch_size})',
+                lambda: deque(parser(file_path, batch_size=batch_size), maxlen=0),
+            )
+
+
+def bench_serial_backends():
+    payloads = dict(
+        wide_tree=SerialView(get_wide_tree()).get_serializable_props(ordered=False),
+        linked_terms=SerialView(linked_terms.psm, depth=5).get_serializable_props(ordered=False),
+    )
+    for serial_format, backends in SERIAL_BACKENDS.items():
+        for backend in backends:
+            for name, data in payloads.items():
+                title = f'{backend.name} {name}'
+                if not backend.is_available():
+                    print(f'{title}: not available')
+                    continue
+                text = backend.dumps(data)
+                print_time(f'{title} dumps', lambda: backend.dumps(data), repeats=1)
+                print_time(f'{title} loads', lambda: backend.loads(text), repeats=1)
+
+
+def bench_child_interning(width: int = 10, depth: int = 4, repeats: int = 3):
+    tree = get_wide_tree(width=width, depth=depth)
+    paths = [['item0'] * (depth - 1) + [f'item{n}'] for n in range(width)] * 100
+
+    def traverse(root):
+        for _ in range(repeats):
+            for path in paths:
+                root.get_node(path)
+
+    root = CommonWrapper(tree)
+    print_time('get_node', lambda: traverse(root))
+    root.enable_child_interning()
+    print_time('get_node with interning', lambda: traverse(root))
+    tracemalloc.start()
+    wrappers = [CommonWrapper(p, path=p) for p in paths]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'CommonWrapper: {(size - sys.getsizeof(wrappers)) / len(wrappers):.0f} bytes')
+
+
+def bench_path_memory(count: int = 100000):
+    for depth in (1, 10, 100):
+        parent = CommonWrapper(dict(), path=['item'] * depth)
+        tracemalloc.start()
+        wrappers = [parent._get_wrapped_child(n, n) for n in range(count)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'child wrapper at depth {depth}: {(size - sys.getsizeof(wrappers)) / count:.0f} bytes')
+
+
+def bench_render(records_count: int = 2000):
+    records = [dict(n=n, name=f'record {n}', tags=['a', 'b']) for n in range(records_count)]
+    views = dict(
+        tree=TreeViewer(depth=3).get_view(records),
+        table=TableViewer().get_view(records),
+        serial=SerialView(records),
+    )
+    with open(os.devnull, 'w') as devnull:
+        for name, view in views.items():
+            for render_format in view.get_formats():
+                size = view.render(devnull, render_format)
+                seconds = timeit(lambda: view.render(devnull, render_format), number=1)
+                print(f'render {name} {render_format}: {size / seconds / 1024 / 1024:.1f} MB/s')
+                print_peak_memory(f'render {name} {render_format}', lambda: view.render(devnull, render_format))
+
+
+def bench_nested_lists(depths: tuple = (100, 400, 1600)):
+    for depth in depths:
+        view = FormattedView(['leaf'], tag=TagType.List.create(ordered=False))
+        for n in range(depth):
+            view = FormattedView([f'\nitem{n}', view], tag=TagType.List.create(ordered=False))
+        print_time(f'md of nested lists, depth {depth}', lambda: deque(view.get_md_lines(), maxlen=0), repeats=1)
+        print_time(f'text of nested lists, depth {depth}', lambda: deque(view.get_text_lines(), maxlen=0), repeats=1)
+
+
+def bench_render_tape(width: int = 8, depth: int = 4):
+    tree = get_wide_tree(width=width, depth=depth)  # about 50k nodes of view
+    viewer = TreeViewer(depth=2 * depth + 1)
+    for name, get_view in (('views', viewer.get_view), ('tape', viewer.get_tape)):
+        tracemalloc.start()
+        view = get_view(tree)
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'tree of {name}: {size / 1024 / 1024:.1f} MB (peak {peak / 1024 / 1024:.1f} MB)')
+        with open(os.devnull, 'w') as devnull:
+            for render_format in ('html', 'md', 'text'):
+                print_time(f'render tree of {name} as {render_format}', lambda: view.render(devnull, render_format), repeats=1)
+
+
+def bench_normalization(renders_count: int = 10):
+    # normalization pays off only if one view is rendered repeatedly, so it is measured together with renders
+    shapes = dict(deep=dict(width=8, depth=3), shallow=dict(width=200, depth=1))
+    for shape, kwargs in shapes.items():
+        view = TreeViewer(depth=2 * kwargs['depth'] + 1).get_view(get_wide_tree(**kwargs))
+        normalizing_seconds = timeit(view.get_normalized, number=1)
+        normalized = view.get_normalized()
+        print(f'normalize {shape} tree view: {normalizing_seconds * 1000:.1f} ms')
+        with open(os.devnull, 'w') as devnull:
+            for render_format in ('html', 'md', 'text'):
+                for count in (1, renders_count):
+                    original_seconds = timeit(lambda: view.render(devnull, render_format), number=count)
+                    normalized_seconds = timeit(lambda: normalized.render(devnull, render_format), number=count)
+                    normalized_seconds += normalizing_seconds
+                    print(
+                        f'render {shape} tree view {count} times as {render_format}: '
+                        f'{original_seconds * 1000:.1f} ms, normalized: {normalized_seconds * 1000:.1f} ms',
+                    )
+
+
+def bench_tree_budget(count: int = 1000000):
+    cases = dict(
+        unlimited=(TreeViewer(depth=1), list(range(count // 100))),
+        budget=(TreeViewer(max_items=20, tail_items=5, max_nodes=200), list(range(count))),  # headers are cropped too
+    )
+    for name, (viewer, items) in cases.items():
+        print_time(f'tree view of {len(items)} items with {name} viewer', lambda: viewer.get_view(items), repeats=1)
+        html_len = len(''.join(viewer.get_view(items).get_html_chunks()))
+        print(f'html of {len(items)} items with {name} viewer: {html_len / 1024:.0f} KB')
+
+
+def bench_streaming_table(counts: tuple = (1000, 10000)):
+    def get_records(count: int):
+        for n in range(count):
+            yield dict(n=n, name=f'record {n}', tags=['a', 'b'])
+
+    with open(os.devnull, 'w') as devnull:
+        for count in counts:
+            viewer = TableViewer()
+            title = f'table of {count} records as html'
+            print_peak_memory(title, lambda: viewer.get_view(list(get_records(count))).render(devnull, 'html'))
+            viewer = TableViewer(stream=True)
+            title = f'streaming table of {count} records as html'
+            print_peak_memory(title, lambda: viewer.get_view(get_records(count)).render(devnull, 'html'))
+
+
+def bench_table_columns(count: int = 2000, fields_count: int = 40):
+    records = [{f'field{i}': n * i for i in range(fields_count)} for n in range(count)]
+    print_time(f'table of {fields_count} columns', lambda: TableViewer().get_view(records), repeats=1)
+    columns = ['field1', 'field7', 'field30']
+    print_time(f'table of {len(columns)} projected columns', lambda: TableViewer(columns=columns).get_view(records))
+
+
+def bench_columnar_table(rows_count: int = 100000, columns_count: int = 10):
+    rows = [tuple(n * c if c % 3 else n / (c + 1) for c in range(columns_count)) for n in range(rows_count)]
+    columns = [f'column{c}' for c in range(columns_count)]
+    formats = {c: ColumnFormat(precision=2) for c in columns[::3]}
+    views = dict(
+        rows=TableView(rows, columns=columns),
+        columnar=ColumnarTableView(rows, columns=columns),
+        formatted=ColumnarTableView(rows, columns=columns, formats=formats),
+    )
+    with open(os.devnull, 'w') as devnull:
+        for name, view in views.items():
+            for render_format in ('text', 'md', 'html'):
+                title = f'render {rows_count * columns_count} cells of {name} table as {render_format}'
+                print_time(title, lambda: view.render(devnull, render_format), repeats=1)
+
+
+def bench_column_sources(count: int = 1000000, limit: int = 50):
+    table = memoryview(array('d', range(count * 2))).cast('B').cast('d', shape=[count, 2])  # 2 columns
+    records = [dict(x=n * 2.0, y=n * 2.0 + 1) for n in range(count // 100)]
+    print_time(f'table of {len(records)} records', lambda: TableViewer().get_view(records), repeats=1)
+    print_time(f'table of {limit} of {count} rows of buffer', lambda: TableViewer(limit=limit).get_view(table))
+    print_time(f'table of {count} rows of buffer', lambda: TableViewer().get_view(table), repeats=1)
+
+
+def bench_table_pages(count: int = 200000, page_size: int = 50):
+    records = [dict(n=n, name=f'record {n}') for n in range(count)]
+    viewer = TableViewer()
+    number = count // page_size // 2
+    print_time(f'table of {count // 20} records', lambda: viewer.get_view(records[:count // 20]), repeats=1)
+    print_time(f'page {number} of {count} records', lambda: viewer.get_page(records, number, page_size))
+    print_time(f'page {number} of iterator', lambda: viewer.get_page(iter(records), number, page_size))
+    pager = viewer.get_pager(iter(records), page_size=page_size)
+    print_time('next page of iterator', pager.get_next)
+
+
+if __name__ == '__main__':
+    bench_serialization_engines()
+    bench_json_streaming()
+    bench_yaml_streaming()
+    bench_stream_parsing()
+    bench_serial_backends()
+    bench_child_interning()
+    bench_path_memory()
+    bench_render()
+    bench_nested_lists()
+    bench_render_tape()
+    bench_normalization()
+    bench_tree_budget()
+    bench_streaming_table()
+    bench_table_columns()
+    bench_columnar_table()
+    bench_column_sources()
+    bench_table_pages()
@@ -1,7 +1,34 @@
 import unittest
+import io
+import os
+import json
+import tempfile
+import asyncio
+from threading import Barrier, Event
+import yaml
+from array import array
+from collections import OrderedDict
 
-from wrappers.common_wrapper import CommonWrapper
+from util.type_handlers import (
+    TypeHandler,
+    register_type_handler, unregister_type_handler,
+    get_class_layout, clear_class_layouts, get_name_index, invalidate_name_index,
+)
+from util.lazy_props import Pending
+from util.prefetch import Prefetcher
+from util.column_sources import ColumnSource, get_column_source
+from templates.entity import Entity
+from wrappers.common_wrapper import CommonWrapper, SerializationEngine
+from visual import TagType
+from views.serial_view import SerialView
+from views.formatted_view import FormattedView
+from views.text_view import TextView
+from views.tape_view import TapeView
+from views.columnar_table_view import ColumnarTableView, ColumnFormat
 from viewers.serial_viewer import SerialViewer
+from viewers.tree_viewer import TreeViewer
+from viewers.table_viewer import TableViewer
+from viewers.simple_text_viewer import SimpleTextViewer
 
 
 class TestCommonWrapper(unittest.TestCase):
@@ -33,6 +60,592 @@ class TestCommonWrapper(unittest.TestCase):
         yaml_repr = viewer.get_view(parsed).get_yaml()
         self.assertEqual(line, yaml_repr)
 
+    def test_type_handler(self):
+        class Point:
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+
+        class PointHandler(TypeHandler):
+            def get_tech_name(self, obj) -> str:
+                return f'p{obj.x}_{obj.y}'
+
+            def get_props(self, obj, wrapper, including_protected: bool = False) -> dict:
+                return dict(xy=(obj.x, obj.y))
+
+        w = CommonWrapper(Point(1, 2))
+        self.assertEqual({'x': 1, 'y': 2}, w.get_props(add=[]))
+        register_type_handler(Point, PointHandler())
+        try:
+            self.assertEqual({'xy': (1, 2)}, w.get_props(add=[]))
+            self.assertEqual('p1_2', w.get_tech_name())
+            self.assertEqual(['p1_2'], CommonWrapper([Point(1, 2)]).get_serializable_props(use_tech_names=True))
+        finally:
+            unregister_type_handler(Point)
+        self.assertEqual({'x': 1, 'y': 2}, w.get_props(add=[]))
+
+    def test_builtin_subclass_protocol(self):
+        class Record(dict):  # own protocol of subclass is checked before built-in handler of dict
+            tech_name = 'record'
+
+            def get_props(self):
+                return dict(size=len(self))
+
+        class Names(list):
+            def get_name_or_str(self):
+                return 'names'
+
+        self.assertEqual({'size': 2}, CommonWrapper(Record(a=1, b=2)).get_props())
+        self.assertEqual('record', CommonWrapper(Record()).get_tech_name())
+        self.assertEqual('names', CommonWrapper([Names()]).get_serializable_props(use_tech_names=True)[0])
+        self.assertEqual({'a': 1}, CommonWrapper(dict(a=1)).get_props())
+        self.assertEqual('items', CommonWrapper(['x'], path=['items']).get_tech_name())
+
+    def test_serial_refs(self):
+        shared = [1, 2]
+        d = dict(a=shared, b=shared)
+        d['me'] = d
+        viewer = SerialViewer(use_refs=True)
+        expected_json = '{"a": [1, 2], "b": {"$ref": "#/a"}, "me": {"$ref": "#"}}'
+        self.assertEqual(expected_json, viewer.get_view(d).get_json())
+        expected_yaml = '&id002\na: &id001\n  - 1\n  - 2\nb: *id001\nme: *id002\n'
+        self.assertEqual(expected_yaml, viewer.get_view(d).get_yaml())
+        chain = [0]
+        for n in range(3000):
+            chain = [n, chain, shared]
+        chain = SerialView._get_with_json_refs(chain)  # deeper than recursion limit
+        self.assertEqual({'$ref': '#' + '/1' * 2999 + '/2'}, chain[2])  # first occurrence is the deepest
+
+    def test_class_layout(self):
+        def get_class():
+            class Item:
+                def __init__(self, a):
+                    self.a = a
+
+                @property
+                def double(self):
+                    return self.a * 2
+
+                def method(self):
+                    return self.a
+            return Item
+
+        item_class = get_class()
+        items = [CommonWrapper(item_class(n)) for n in range(3)]
+        for n, w in enumerate(items):
+            self.assertEqual(['a', 'double'], w.get_raw_property_names())
+            self.assertEqual(['method'], list(w.get_method_names()))
+            self.assertEqual(n * 2, w.get_props(add=[])['double'])
+        self.assertIs(get_class_layout(item_class), get_class_layout(item_class))
+        redefined_class = get_class()
+        redefined_class.triple = property(lambda self: self.a * 3)
+        self.assertEqual(['a', 'double', 'triple'], CommonWrapper(redefined_class(1)).get_raw_property_names())
+        subclass = type('SubItem', (item_class, ), dict())
+        self.assertEqual(['a', 'double'], CommonWrapper(subclass(1)).get_raw_property_names())
+        item_class.triple = property(lambda self: self.a * 3)  # patched after first use
+        self.assertEqual(['a', 'double'], CommonWrapper(item_class(1)).get_raw_property_names())  # cached layout
+        clear_class_layouts(item_class)
+        self.assertEqual(['a', 'double', 'triple'], CommonWrapper(item_class(1)).get_raw_property_names())
+        self.assertEqual(['a', 'double', 'triple'], CommonWrapper(subclass(1)).get_raw_property_names())
+
+    def test_path_index(self):
+        d = dict(a=dict(b=[1, 2, dict(c=3)]))
+        root = CommonWrapper(d)
+        root.enable_path_index()
+        node = root.get_node('a.b.2.c')
+        self.assertEqual(3, node.get_raw_object())
+        self.assertTrue(node.is_path_valid())
+        self.assertIs(node, root.get_node(['a', 'b', '2', 'c']))
+        self.assertEqual(4, root.get_path_index_size())
+        self.assertGreater(root.get_path_index_memory(), 0)
+        d['a']['b'][2]['c'] = 4
+        root.invalidate_path_index('a.b')
+        self.assertEqual(1, root.get_path_index_size())
+        self.assertEqual(4, root.get_node('a.b.2.c', wrapped=False))
+
+    def test_child_interning(self):
+        d = dict(a=dict(b=[1, 2]), c={'d'})
+        root = CommonWrapper(d)
+        self.assertEqual(dict(), vars(root))  # all attributes of wrapper are slots
+        entity = Entity('e', synonymes=[], definition='')  # subclasses of common bases are not affected by slots
+        self.assertNotIn('__weakref__', repr(CommonWrapper(entity).get_props()['class']))
+        self.assertEqual(dict(tech_name='e', synonymes=[], definition=''), entity._get_init_kwargs())
+        self.assertIsNot(root.get_node('a.b'), root.get_node('a.b'))
+        root.enable_child_interning()
+        node = root.get_node('a.b')
+        self.assertIs(node, root.get_node('a.b'))
+        self.assertEqual(['a', 'b'], node.get_path())
+        d['a']['b'] = [3]
+        self.assertEqual([3], root.get_node('a.b').get_raw_object())
+        cache = {CommonWrapper((1, 2)): 'b', CommonWrapper(frozenset('d')): 'c', CommonWrapper(5): 5}
+        self.assertEqual('b', cache[CommonWrapper((1, 2))])
+        self.assertEqual('c', cache[CommonWrapper(frozenset('d'))])
+        self.assertEqual(5, cache[CommonWrapper(5)])
+        with self.assertRaises(TypeError):  # as the wrapped list
+            hash(node)
+        self.assertEqual(root, root.copy())
+
+    def test_linked_path(self):
+        d = dict(a=dict(b=[1, dict(c=3)]))
+        root = CommonWrapper(d)
+        parent = root.get_node('a.b')
+        child = parent.get_node('1.c')
+        self.assertEqual(['a', 'b', '1', 'c'], child.get_path())
+        self.assertEqual('a.b.1.c', child.get_tech_name())
+        self.assertIs(parent.get_linked_path(), child.get_linked_path().get_parent().get_parent())
+        self.assertTrue(child.is_path_valid())
+        self.assertEqual(['x', 'y'], CommonWrapper(d, path='x.y').get_path())
+
+    def test_lazy_props(self):
+        calls = list()
+
+        class Record:
+            def __init__(self, n):
+                self.n = n
+
+            @property
+            def heavy(self):
+                calls.append(self.n)
+                return self.n * 2
+
+        wrapped = CommonWrapper(Record(1))
+        props = wrapped.get_props(lazy=True)
+        self.assertEqual(['class', 'path', 'n', 'heavy'], list(props))
+        self.assertIn('heavy', props)
+        self.assertEqual([], calls)
+        self.assertEqual(2, props['heavy'])
+        self.assertEqual(2, props['heavy'])
+        self.assertEqual([1], calls)
+        self.assertEqual(wrapped.get_props(), OrderedDict(props))
+        for viewer in (TreeViewer(), TableViewer(), SimpleTextViewer()):
+            calls.clear()
+            text = viewer.get_view(Record(2)).get_text()
+            self.assertIn('4', text)
+            self.assertEqual([2], calls)
+
+    def test_render(self):
+        data = dict(a=[1, 2], b=Entity('e', synonymes=['s'], definition='d'))
+        views = TreeViewer().get_view(data), TableViewer().get_view(data['b']), SerialViewer().get_view(data)
+        expected = dict(
+            text=lambda v: v.get_text(), md=lambda v: v._repr_markdown_(), html=lambda v: v._repr_html_(),
+            json=lambda v: v.get_json(), yaml=lambda v: v.get_yaml(),
+        )
+        for view in views:
+            for serial_format in view.get_formats():
+                stream = io.StringIO()
+                written = view.render(stream, serial_format, buffer_size=8)
+                self.assertEqual(expected[serial_format](view), stream.getvalue())
+                self.assertEqual(len(stream.getvalue()), written)
+        with self.assertRaises(ValueError):
+            views[0].render(io.StringIO(), 'json')
+
+    def test_nested_lists_indent(self):
+        def get_chain(depth: int) -> FormattedView:
+            view = FormattedView(['leaf'], tag=TagType.List.create(ordered=False))
+            for n in range(depth):
+                view = FormattedView([f'\nn{n}', view], tag=TagType.List.create(ordered=False))
+            return view
+
+        expected = ['', '', 'n1', '  ', '  n0', '    leaf', '    ', '  ', '']
+        self.assertEqual(expected, list(get_chain(2).get_md_lines()))
+        expected = ['', 'n1', '  ', '  n0', '    leaf', '    ', '  ', '']
+        self.assertEqual(expected, list(get_chain(2).get_text_lines()))
+        deep_lines = list(get_chain(3000).get_md_lines())  # deeper than recursion limit
+        self.assertEqual(' ' * 2 * 3000 + 'leaf', deep_lines[2 * 3000 + 1])
+
+    def test_name_index(self):
+        terms = [Entity(f'term{n}', synonymes=[], definition='') for n in range(20)]
+        w = CommonWrapper(terms)
+        self.assertIs(terms[17], w.get_raw_property('term17'))
+        self.assertIs(get_name_index(terms), get_name_index(terms))
+        terms.append(Entity('added', synonymes=[], definition=''))
+        self.assertIs(terms[-1], w.get_raw_property('added'))
+        terms[0].tech_name = 'renamed'
+        invalidate_name_index(terms)
+        self.assertIs(terms[0], w.get_raw_property('renamed'))
+        terms[5] = Entity('term5', synonymes=[], definition='new')  # replaced at the same length
+        self.assertIs(terms[5], w.get_raw_property('term5'))
+        terms[6] = Entity('new6', synonymes=[], definition='')
+        with self.assertRaises(ValueError):  # stale position is checked by name of item
+            w.get_raw_property('term6')
+        index = get_name_index(terms)
+        with self.assertRaises(ValueError):  # missing name does not rebuild index
+            w.get_raw_property('unknown')
+        self.assertIs(index, get_name_index(terms))
+        invalidate_name_index(terms)  # new names are found after invalidation
+        self.assertIs(terms[6], w.get_raw_property('new6'))
+
+    def test_iterative_serialization(self):
+        shared = dict(x=(1, 2), y={3})
+        d = OrderedDict(a=[shared, shared], b=Entity('e', synonymes=['s'], definition=''))
+        chain = dict(n=0)
+        for n in range(3000):
+            chain = dict(n=n, next=chain)
+        try:
+            for depth in (None, 1, 2):
+                for use_tech_names in (False, True):
+                    expected = CommonWrapper(d).get_serializable_props(depth=depth, use_tech_names=use_tech_names)
+                    CommonWrapper.set_serialization_engine(SerializationEngine.Iterative)
+                    received = CommonWrapper(d).get_serializable_props(depth=depth, use_tech_names=use_tech_names)
+                    CommonWrapper.set_serialization_engine(SerializationEngine.Recursive)
+                    self.assertEqual(expected, received)
+            CommonWrapper.set_serialization_engine('iterative')
+            self.assertEqual(0, SerialViewer().get_view(chain).get_serializable_props()['next']['next']['n'] - 2997)
+        finally:
+            CommonWrapper.set_serialization_engine(SerializationEngine.Recursive)
+
+    def test_json_stream(self):
+        shared = [1, 'б', 2.5]
+        d = {'a': shared, 1: dict(b=shared, c=(True, 2.5)), 'e': Entity('e', synonymes=[], definition='')}
+        for use_refs in (False, True):
+            view = SerialViewer(use_tech_names=False, use_refs=use_refs).get_view(d)
+            stream = io.StringIO()
+            view.write_json(stream)
+            self.assertEqual(view.get_json(), stream.getvalue())
+            self.assertEqual(view.get_json(), ''.join(view.get_json_chunks()))
+        d['me'] = d
+        with self.assertRaises(ValueError):
+            SerialViewer().get_view(d).write_json(io.StringIO())
+
+    def test_yaml_stream(self):
+        shared = [1, 'б', 'yes', '']
+        d = {'a': shared, 1: dict(b=shared, c=(True, 2.5)), 'e': Entity('e', synonymes=[], definition='')}
+        for use_refs in (False, True):
+            view = SerialViewer(use_tech_names=False, use_refs=use_refs).get_view(d)
+            stream = io.StringIO()
+            view.write_yaml(stream)
+            self.assertEqual(view.get_yaml(), stream.getvalue())
+            stream = io.StringIO()
+            view.write_yaml(stream, fast=True)
+            self.assertEqual(yaml.safe_load(view.get_yaml()), yaml.safe_load(stream.getvalue()))
+
+    def test_parse_stream(self):
+        records = [dict(tech_name=f'r{n}', synonymes=[n], definition=f'record {n}') for n in range(5)]
+        yaml_text = yaml.safe_dump_all(records)
+        jsonl_text = '\n'.join(json.dumps(i) for i in records) + '\n\n'
+        viewer = SerialViewer()
+        for serial_format, text in (('yaml', yaml_text), ('jsonl', jsonl_text)):
+            parsed = viewer.parse_stream(io.StringIO(text), serial_format)
+            self.assertEqual(records, [i.get_raw_object() for i in parsed])
+            batches = list(viewer.parse_stream(io.StringIO(text), serial_format, batch_size=2))
+            self.assertEqual([2, 2, 1], [len(i) for i in batches])
+            self.assertEqual(records[4], batches[-1][0].get_raw_object())
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, 'records.jsonl')
+            with open(file_path, 'w') as fp:
+                fp.write(jsonl_text)
+            entities = list(viewer.parse_stream(file_path, 'jsonl', target_class=Entity))
+            self.assertEqual('record 3', entities[3].get_raw_object().definition)
+
+
+class TestPrefetcher(unittest.TestCase):
+    def test_prefetch(self):
+        started = Barrier(3, timeout=10)  # fast getters are waiting for each other, so they can only run concurrently
+        released = Event()  # slow getter is blocked until assertions are done
+
+        class Remote:
+            def __init__(self, n):
+                self.n = n
+
+            @property
+            def remote(self):
+                if self.n == 0:
+                    released.wait(timeout=10)
+                else:
+                    started.wait()
+                return f'remote{self.n}'
+
+        records = [Remote(n) for n in range(4)]
+        with Prefetcher(max_workers=8, timeout=0.2) as prefetcher:
+            CommonWrapper.set_prefetcher(prefetcher)
+            try:
+                text = TableViewer().get_view(records).get_text()
+                wrapped = CommonWrapper(records[0])
+                props = wrapped.prefetch_props(wrapped.get_props(lazy=True))
+                self.assertIsInstance(props['remote'], Pending)
+            finally:
+                CommonWrapper.set_prefetcher(None)
+                released.set()
+        self.assertIn('remote3', text)
+        self.assertNotIn('remote0', text)
+        self.assertIn('...', text)
+        slow = prefetcher.stats.get_records()
+        self.assertEqual(('Remote', 'remote'), (slow[0]['owner'], slow[0]['property']))
+        self.assertEqual(2, slow[0]['timeouts'])
+
+    def test_prefetch_shown_props(self):
+        called = set()
+
+        class Remote:
+            pass
+
+        for n in range(10):  # properties p0...p9 shown after class and path, each records its call
+            setattr(Remote, f'p{n}', property(lambda self, name=f'p{n}': called.add(name) or name))
+        tree_viewer = TreeViewer(depth=1, max_items=4, tail_items=1)
+        cases = (
+            (tree_viewer.get_view, {'p0', 'p9'}),
+            (tree_viewer.get_tape, {'p0', 'p9'}),
+            (TableViewer(limit=4).get_view, {'p0', 'p1'}),
+        )
+        for get_view, expected in cases:
+            called.clear()
+            with Prefetcher(max_workers=4, timeout=10) as prefetcher:
+                CommonWrapper.set_prefetcher(prefetcher)
+                try:
+                    text = ''.join(get_view(Remote()).get_chunks('text'))
+                finally:
+                    CommonWrapper.set_prefetcher(None)
+                prefetcher.shutdown(wait=True)  # waits for all started getters
+            self.assertEqual(expected, called)  # getters of hidden props are not started
+            self.assertNotIn('p5', text)
+
+
+class TestAsyncRendering(unittest.TestCase):
+    def test_async_rendering(self):
+        calls = list()
+        entered, released = Event(), Event()  # render thread is blocked inside first slow getter
+
+        class Remote:
+            def __init__(self, n):
+                self.n = n
+
+            @property
+            def remote(self):
+                return self._fetch()
+
+            async def _fetch(self):
+                await asyncio.sleep(0)
+                return f'fetched{self.n}'
+
+            @property
+            def slow(self):
+                calls.append(self.n)
+                entered.set()
+                released.wait(timeout=10)
+                return self.n
+
+        async def render():
+            released.set()
+            view = await TableViewer().aget_view([Remote(n) for n in range(3)])
+            self.assertIn('fetched2', view.get_text())
+            html = ''.join([chunk async for chunk in view.aiter_html(buffer_size=10)])
+            self.assertEqual(view._repr_html_(), html)
+            serial_view = SerialViewer().get_view(dict(a=[1, 2], b=Remote(5)))
+            chunks = [chunk async for chunk in serial_view.aiter_json(buffer_size=1)]
+            self.assertGreater(len(chunks), 2)
+            self.assertIn('"remote": "fetched5"', ''.join(chunks))
+            calls.clear()
+            entered.clear(), released.clear()
+            task = asyncio.create_task(TreeViewer().aget_view([Remote(n) for n in range(100)]))
+            await asyncio.to_thread(entered.wait, 10)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            released.set()
+            await asyncio.get_running_loop().shutdown_default_executor()  # waits for render thread
+            self.assertEqual([0], calls)  # rendering stopped at first checkpoint after cancellation
+
+        asyncio.run(render())
+
+
+class RenderingTestCase(unittest.TestCase):
+    render_formats = 'html', 'md', 'text'
+
+    def assertSameRendering(self, expected, received):
+        for render_format in self.render_formats:
+            with self.subTest(render_format=render_format):
+                expected_text = ''.join(expected.get_chunks(render_format))
+                self.assertEqual(expected_text, ''.join(received.get_chunks(render_format)))
+
+    @staticmethod
+    def get_sample_tree() -> dict:
+        return {'a': [1, 'b\nc', {2, 3}], None: dict(e=Entity('e', synonymes=[], definition=''), f=[]), 4: 'g'}
+
+
+class TestTapeView(RenderingTestCase):
+    def test_render_tape(self):
+        d = self.get_sample_tree()
+        viewer = TreeViewer(depth=4)
+        tape = viewer.get_tape(d)
+        view = viewer.get_view(d)
+        nested = FormattedView(['h', None, 2.5, TextView(['i', 'j']), view], tag=TagType.Div)
+        self.assertSameRendering(view, tape)
+        self.assertSameRendering(view, tape.to_view())
+        self.assertSameRendering(nested, TapeView.from_view(nested))
+        self.assertLess(len(tape._tags), tape.get_nodes_count() / 4)  # tags are interned
+
+
+class TestNormalizedView(RenderingTestCase):
+    def test_normalized_view(self):
+        d = self.get_sample_tree()
+        view = TreeViewer(depth=4).get_view(d)
+        nested = FormattedView([
+            FormattedView(['h', None, '', FormattedView(['i', 2.5])]),
+            FormattedView([FormattedView([None, TextView(['j', 'k'])])], tag=TagType.Div),
+            FormattedView([None, FormattedView(['l', 'm'], tag=TagType.List)], tag=TagType.ListItem),
+        ])
+        for original in (view, nested, TreeViewer(depth=4, normalize=True).get_view(d)):
+            self.assertSameRendering(original, original.get_normalized())
+        normalized = nested.get_normalized()
+        self.assertEqual(['h', '', 'i', 2.5], normalized.get_data()[:4])
+        self.assertEqual(['j', 'k'], normalized.get_data()[4].get_data()[0].get_data())
+        self.assertEqual(None, nested.get_data()[0].get_data()[1])  # original is not modified
+
+
+class TestTreeViewerBudget(RenderingTestCase):
+    def test_tree_budget(self):
+        items = list(range(1000)) + [dict(a=1, b=2, c=3, d=4)]
+        viewer = TreeViewer(depth=3, max_items=3, tail_items=1, max_line_len=30)
+        lines = [i.strip() for i in viewer.get_view(items).get_text_lines()]
+        self.assertEqual(30, len(lines[0]))
+        self.assertIn('- … 998 more items', lines)
+        self.assertIn('- … 1 more item', lines)
+        self.assertIn('- a: 1', lines)
+        self.assertIn('- d: 4', lines)
+        viewer = TreeViewer(depth=3, max_nodes=5)
+        view = viewer.get_view(items)
+        lines = [i.strip() for i in view.get_text_lines()]
+        self.assertIn('- 4', lines)
+        self.assertNotIn('- 5', lines)
+        self.assertIn('- … 996 more items', lines)
+        self.assertSameRendering(view, viewer.get_tape(items))
+
+    def test_budget_bounds_headers(self):
+        iterated = list()
+
+        class Items(list):  # counts iterated items
+            def __iter__(self):
+                for i in super().__iter__():
+                    iterated.append(i)
+                    yield i
+
+        items = Items(range(1000000))
+        for viewer in (TreeViewer(depth=1, max_items=20), TreeViewer(depth=1, max_nodes=100)):
+            iterated.clear()
+            html = ''.join(viewer.get_view(items).get_html_chunks())
+            self.assertLess(len(html), 10000)
+            self.assertLess(len(iterated), 200)  # one-line header is cropped without iterating all items
+
+
+class TestTableViewer(RenderingTestCase):
+    def test_streaming_table(self):
+        records = [dict(a=n, b=f'x{n}') for n in range(5)] + [dict(a=9, c=1)]
+        expected = TableViewer().get_view(records)
+        for render_format in self.render_formats:  # streaming view can be rendered only once
+            view = TableViewer(stream=True).get_view(iter(records))
+            self.assertEqual(''.join(expected.get_chunks(render_format)), ''.join(view.get_chunks(render_format)))
+        view = TableViewer(stream=True, sample_size=3).get_view(iter(records))
+        self.assertEqual(['a', 'b'], view.get_column_names())
+        self.assertEqual('9\t-', list(view.get_text_lines())[-1])
+        view = TableViewer(stream=True, sample_size=3, late_columns='extra').get_view(iter(records))
+        self.assertEqual('9\t-\tc: 1', list(view.get_text_lines())[-1])
+        view = TableViewer(stream=True, sample_size=3, late_columns='error').get_view(iter(records))
+        with self.assertRaises(ValueError):
+            list(view.get_text_lines())
+
+    def test_table_columns(self):
+        records = [dict(n=n, name=f'r{n}', owner=Entity(f'o{n}', synonymes=[], definition=f'd{n}')) for n in range(3)]
+        records.append(dict(n=3))
+        view = TableViewer(columns=['name', 'owner.definition', ('owner', 'tech_name')]).get_view(records)
+        self.assertEqual(['name', 'owner.definition', 'owner.tech_name'], view.get_column_names())
+        self.assertEqual('r1\td1\to1', list(view.get_text_lines())[2])
+        self.assertEqual('-\t-\t-', list(view.get_text_lines())[4])
+        view = TableViewer(stream=True, columns=['n']).get_view(iter(records))
+        self.assertEqual(['n', '0', '1', '2', '3'], list(view.get_text_lines()))
+        for path in ('name', 'owner.definition', 'owner.class', 'n.real'):
+            wrapped = CommonWrapper(records[1])
+            self.assertEqual(wrapped.get_node(path, wrapped=False), wrapped.get_raw_node(path))
+
+    def test_column_sources(self):
+        class Column(list):  # only slices of column can be read
+            def __iter__(self):
+                raise AssertionError('column is iterated')
+
+            def __getitem__(self, item):
+                assert isinstance(item, slice)
+                return list(super().__iter__())[item]
+
+        class StructuredArray:
+            dtype = type('Dtype', (), dict(names=('n', 'share')))
+
+            def __len__(self):
+                return 1000
+
+            def __getitem__(self, name):
+                return Column(range(1000)) if name == 'n' else Column(n / 1000 for n in range(1000))
+
+        class Frame(StructuredArray):
+            columns = StructuredArray.dtype.names
+
+            def __array__(self):
+                raise AssertionError('frame is copied')
+
+        formats = dict(share=ColumnFormat(percent=True))
+        for obj in (StructuredArray(), Frame()):
+            view = TableViewer(limit=3, formats=formats).get_view(obj)
+            self.assertEqual(['n\tshare', '0\t0.0%', '1\t0.1%', '2\t0.2%'], view.get_text_lines())
+            view = TableViewer(limit=2, columns=['share', 'other']).get_view(obj)
+            self.assertEqual(['share\tother', '0.0\t-', '0.001\t-'], view.get_text_lines())
+        view = TableViewer(limit=2).get_view(array('d', [0.5, 1.5, 2.5]))
+        self.assertEqual(['value', '0.5', '1.5'], view.get_text_lines())
+        view = TableViewer().get_view(memoryview(array('q', range(6))).cast('B').cast('q', shape=[3, 2]))
+        self.assertEqual(['0\t1', '0\t1', '2\t3', '4\t5'], view.get_text_lines())
+        values = array('d', [0.5, 1.5])
+        source = get_column_source(values)
+        self.assertEqual(dict(value=[1.5]), source.get_columns(1, 2))
+        values.append(2.5)  # buffer is not locked by source
+        self.assertEqual((3, dict(value=[2.5])), (source.get_count(), source.get_columns(2, 3)))
+        self.assertIsNone(get_column_source(b'bytes'))
+        self.assertIsNone(get_column_source([1, 2]))
+        self.assertIsNone(get_column_source(memoryview(b'ab').cast('c')))  # items are not numbers
+        with self.assertRaises(TypeError):  # ColumnSource is abstract
+            type('Source', (ColumnSource,), dict(get_column_names=lambda self: ['n']))([1])
+
+    def test_table_pages(self):
+        records = [dict(n=n) for n in range(1000)]
+        viewer = TableViewer()
+        self.assertEqual(['n', '6', '7'], viewer.get_page(records, 3, page_size=2).get_text_lines())
+        self.assertEqual(['n', '6', '7'], viewer.get_page(iter(records), 3, page_size=2).get_text_lines())
+        view = TableViewer(offset=2, limit=2).get_view(dict(a=1, b=2, c=3, d=4))
+        self.assertEqual(['field\thint\tvalue', 'c\tint\t3', 'd\tint\t4'], view.get_text_lines())
+        view = TableViewer(offset=998, limit=5, stream=True).get_view(iter(records))
+        self.assertEqual(['n', '998', '999'], list(view.get_text_lines()))
+        self.assertEqual(['value', '2.0'], TableViewer(offset=2, limit=1).get_view(array('d', range(5))).get_text_lines())
+        pager = viewer.get_pager(iter(records), page_size=300)
+        self.assertEqual('page 1 of ~4', pager.get_title())
+        self.assertEqual(['n', '0'], pager.get_next().get_text_lines()[:2])  # first page is not skipped
+        self.assertEqual(['n', '300'], pager.get_next().get_text_lines()[:2])
+        self.assertEqual('300', pager.get_page(1).get_text_lines()[1])
+        self.assertEqual(101, len(pager.get_page(3).get_text_lines()))
+        self.assertEqual((1000, 'page 4 of 4'), (pager.get_count(), pager.get_title()))
+        with self.assertRaises(ValueError):
+            pager.get_previous()
+        pager = viewer.get_pager(records, page_size=300)
+        self.assertEqual((4, '999'), (pager.get_pages_count(), pager.get_page(3).get_text_lines()[-1]))
+        view = TableViewer(columnar=True).get_view(records[:5])
+        self.assertEqual(['n', '2', '3'], view.get_page(1, page_size=2).get_text_lines())
+        self.assertEqual(['n', '4'], view.get_window(4, 10).get_text_lines())
+
+
+class TestColumnarTableView(RenderingTestCase):
+    def test_columnar_table(self):
+        records = [dict(n=n, share=n / 8, name=f'r{n}', flag=n % 2 == 0, big=10 ** 30 * n) for n in range(4)]
+        records.append(dict(n=4, name=FormattedView(['b'], tag=TagType.Span)))  # missing share is masked
+        expected, received = TableViewer().get_view(records), TableViewer(columnar=True).get_view(records)
+        self.assertIsInstance(received, ColumnarTableView)
+        self.assertEqual([True, True, False, False, False], [c.is_typed() for c in received.get_table_columns()])
+        self.assertSameRendering(expected, received)
+        self.assertEqual(list(expected.get_html_lines()), list(received.get_html_lines()))
+        self.assertEqual(len(records), len(received))
+        formats = dict(share=ColumnFormat(percent=True, round_digits=1), n=ColumnFormat(precision=2))
+        view = ColumnarTableView(dict(n=[1, None, 2.5], share=[0.125, 0.07, None]), formats=formats)
+        self.assertEqual(['n\tshare', '1.00\t12.5%', '-\t7.0%', '2.50\t-'], view.get_text_lines())
+        self.assertEqual([(1, 0.125), (None, 0.07), (2.5, None)], view.get_data())
+        view = ColumnarTableView([(0.5, 'x')], formats={0: ColumnFormat(precision=1, percent=True, delimiter=' ')})
+        self.assertEqual(['50.0 %\tx'], view.get_text_lines())
+        with self.assertRaises(AssertionError):  # cells of ragged rows can not be dropped silently
+            ColumnarTableView([(1, 'a'), (2,)])
+
 
 if __name__ == '__main__':
     unittest.main()
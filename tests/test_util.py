@@ -1,6 +1,9 @@
 import unittest
 
-from util.functions import get_max_value, smart_round, remove_redundant_spacing
+from util.functions import get_max_value, smart_round, remove_redundant_spacing, get_head_and_tail
+from util.functions import get_joined_chunks, get_joined_blocks, get_window
+from util.serial_backends import SerialBackend, get_serial_backend, get_serial_backends
+from util.linked_path import LinkedPath
 from examples.stats.data_for_charts import simple_funnel_data, rich_funnel_data
 
 
@@ -44,5 +47,63 @@ class TestRemoveRedundantSpacing(unittest.TestCase):
         self.assertEqual(expected, received)
 
 
+class TestGetHeadAndTail(unittest.TestCase):
+    def test_get_head_and_tail(self):
+        self.assertEqual(([0, 1], 7, [9]), get_head_and_tail(list(range(10)), 2, 1))
+        self.assertEqual((['a'], 1, ['c']), get_head_and_tail(dict(a=1, b=2, c=3), 1, 1))
+        self.assertEqual(([0, 1], 0, [2]), get_head_and_tail({0, 1, 2}, 2, 5))
+        self.assertEqual(([0, 1, 2], 0, []), get_head_and_tail((0, 1, 2), 5, 5))
+
+
+class TestGetJoinedBlocks(unittest.TestCase):
+    def test_get_joined_blocks(self):
+        for count in (0, 1, 5, 6, 12):
+            lines = [f'line{n}' for n in range(count)]
+            self.assertEqual(''.join(get_joined_chunks(lines)), ''.join(get_joined_blocks(lines, lines_per_block=3)))
+        self.assertEqual(['a\nb', '\nc'], list(get_joined_blocks('abc', lines_per_block=2)))
+
+
+class TestGetWindow(unittest.TestCase):
+    def test_get_window(self):
+        self.assertEqual([3, 4], get_window(list(range(10)), 3, 2))
+        self.assertEqual(range(8, 10), get_window(range(10), 8, 5))
+        self.assertEqual([3, 4], list(get_window(iter(range(10)), 3, 2)))
+        self.assertEqual(['c'], list(get_window(dict(a=1, b=2, c=3), 2)))
+
+
+class TestSerialBackends(unittest.TestCase):
+    def test_serial_backends(self):
+        data = {'a': [1, 2.5, 'б', None, True], 'b': {'c': 'yes', 'd': []}}
+        for serial_format in ('json', 'yaml'):
+            exact = get_serial_backend(serial_format, exact=True)
+            self.assertTrue(exact.exact)
+            expected = exact.dumps(data)
+            for backend in get_serial_backends(serial_format):
+                received = backend.dumps(data)
+                if backend.exact:
+                    self.assertEqual(expected, received)
+                self.assertEqual(data, backend.loads(received))
+                self.assertEqual(data, backend.loads(expected))
+        with self.assertRaises(ValueError):
+            get_serial_backend('json', exact=True, name='orjson')
+        with self.assertRaises(TypeError):  # loads() is not implemented
+            type('DumpsOnly', (SerialBackend, ), dict(dumps=lambda self, data: ''))()
+
+
+class TestLinkedPath(unittest.TestCase):
+    def test_linked_path(self):
+        parent = LinkedPath.from_list(['a', 0])
+        child = parent.get_child('b')
+        self.assertIs(parent, child.get_parent())
+        self.assertEqual(['a', 0, 'b'], child.get_list())
+        self.assertEqual('a.0.b', child.get_str())
+        self.assertEqual(3, len(child))
+        self.assertEqual(child, ['a', 0, 'b'])
+        self.assertEqual(child, LinkedPath('b', parent=LinkedPath.from_list(['a', 0])))
+        self.assertNotEqual(child, LinkedPath('b', parent=LinkedPath('a')))
+        self.assertEqual(hash(child), hash(LinkedPath.from_list(['a', 0, 'b'])))
+        self.assertIsNone(LinkedPath.from_list([]))
+
+
 if __name__ == '__main__':
     unittest.main()
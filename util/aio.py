@@ -0,0 +1,120 @@
+from typing import Optional, Callable, Iterable, AsyncIterator
+from contextvars import ContextVar, copy_context
+from functools import partial
+from inspect import isawaitable
+from threading import Event, Semaphore
+import asyncio
+
+MAX_PENDING_CHUNKS = 16  # produced chunks waiting for consumer, limits memory of async iterators
+POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class RenderCancelledError(Exception):
+    pass
+
+
+class RenderState:
+    """
+    State of rendering started by run_in_thread() or aiter_in_thread(), visible inside render thread only:
+    event loop for awaiting property values and flag of cancellation.
+    """
+    __slots__ = 'loop', 'cancelled'
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.cancelled = Event()
+
+
+_render_state: ContextVar[Optional[RenderState]] = ContextVar('render_state', default=None)
+
+
+def check_cancelled():
+    # checkpoint inside render thread, raises RenderCancelledError after cancellation of awaiting task
+    state = _render_state.get()
+    if state is not None and state.cancelled.is_set():
+        raise RenderCancelledError('rendering cancelled')
+
+
+def resolve_awaitable(value):
+    """
+    Inside render thread awaits awaitable value (i.e. coroutine returned by async property) in event loop
+    which started rendering. Outside of async rendering values are returned as is.
+    """
+    state = _render_state.get()
+    if state is None or not isawaitable(value):
+        return value
+    check_cancelled()
+    return asyncio.run_coroutine_threadsafe(_get_awaited(value), state.loop).result()
+
+
+async def _get_awaited(awaitable):
+    return await awaitable
+
+
+def _get_render_context(state: RenderState):
+    context = copy_context()
+    context.run(_render_state.set, state)
+    return context
+
+
+async def run_in_thread(func: Callable, *args, **kwargs):
+    """
+    Calls func in default executor without blocking event loop.
+    On cancellation of awaiting task rendering stops at nearest checkpoint (see check_cancelled()).
+    """
+    loop = asyncio.get_running_loop()
+    state = RenderState(loop)
+    context = _get_render_context(state)
+    try:
+        return await loop.run_in_executor(None, partial(context.run, func, *args, **kwargs))
+    except asyncio.CancelledError:
+        state.cancelled.set()
+        raise
+
+
+async def aiter_in_thread(get_chunks: Callable[[], Iterable[str]]) -> AsyncIterator[str]:
+    """
+    Produces chunks by get_chunks() in default executor and yields them in event loop,
+    so event loop gets control between chunks.
+    Producer is stopped when iteration is finished, cancelled or closed.
+    """
+    loop = asyncio.get_running_loop()
+    state = RenderState(loop)
+    queue = asyncio.Queue()
+    slots = Semaphore(MAX_PENDING_CHUNKS)
+
+    def put(chunk, error=None):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (chunk, error))
+        except RuntimeError:  # loop is closed
+            state.cancelled.set()
+
+    def produce():
+        try:
+            for chunk in get_chunks():
+                while not slots.acquire(timeout=POLL_SECONDS):
+                    check_cancelled()
+                check_cancelled()
+                put(chunk)
+        except RenderCancelledError:
+            pass
+        except BaseException as e:
+            put(_DONE, e)
+        else:
+            put(_DONE)
+
+    producer = loop.run_in_executor(None, partial(_get_render_context(state).run, produce))
+    try:
+        while True:
+            chunk, error = await queue.get()
+            if chunk is _DONE:
+                if error is not None:
+                    raise error
+                break
+            slots.release()
+            yield chunk
+        await producer
+    finally:
+        state.cancelled.set()
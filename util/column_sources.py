@@ -0,0 +1,118 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Iterable, Sequence
+
+BUFFER_COLUMN_NAME = 'value'
+NOT_TABLE_BUFFERS = str, bytes, bytearray
+NUMBER_FORMATS = frozenset('?bBhHiIlLqQnNfd')  # native struct formats of numbers readable by memoryview.tolist()
+
+
+class ColumnSource(ABC):
+    """
+    Column-oriented access to table-like object: values of window of rows are taken by columns,
+    by slicing of columns (without copying for NumPy, only window is copied for buffers), without iterating rows.
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    @abstractmethod
+    def get_column_names(self) -> list:
+        pass
+
+    def get_count(self) -> int:
+        return len(self.obj)
+
+    @abstractmethod
+    def get_column(self, name, start: int, stop: int) -> Sequence:
+        pass
+
+    def get_columns(self, start: int, stop: int, names: Optional[Iterable] = None) -> dict:
+        # missing columns are filled by None
+        known_names = self.get_column_names()
+        if names is None:
+            names = known_names
+        columns = dict()
+        for name in names:
+            if name in known_names:
+                columns[name] = self.get_column(name, start, stop)
+            else:
+                columns[name] = [None] * max(min(stop, self.get_count()) - start, 0)
+        return columns
+
+
+class StructuredArraySource(ColumnSource):
+    # i.e. NumPy structured (record) array: columns are fields of dtype, obj[name] is view without copying
+    def get_column_names(self) -> list:
+        return list(self.obj.dtype.names)
+
+    def get_column(self, name, start: int, stop: int) -> Sequence:
+        return self.obj[name][start:stop]
+
+
+class FrameSource(ColumnSource):
+    # i.e. pandas or polars DataFrame: has columns and __array__(), obj[name] is column (Series)
+    def get_column_names(self) -> list:
+        return list(self.obj.columns)
+
+    def get_column(self, name, start: int, stop: int) -> Sequence:
+        column = self.obj[name]
+        window = column.iloc[start:stop] if hasattr(column, 'iloc') else column[start:stop]
+        return window.to_numpy() if hasattr(window, 'to_numpy') else window
+
+
+class BufferSource(ColumnSource):
+    # object supporting buffer protocol (i.e. array.array, 2-dimensional NumPy array), read through memoryview,
+    # views are released after each read, so object (i.e. array.array) can be resized between reads
+
+    def get_ndim(self) -> int:
+        with memoryview(self.obj) as view:
+            return view.ndim
+
+    def get_column_names(self) -> list:
+        with memoryview(self.obj) as view:
+            if view.ndim == 1:
+                return [BUFFER_COLUMN_NAME]
+            return list(range(view.shape[1]))
+
+    def get_count(self) -> int:
+        with memoryview(self.obj) as view:
+            return view.shape[0]
+
+    def get_rows(self, start: int, stop: int) -> list:
+        # copy of window (values for 1 dimension, rows for 2 dimensions)
+        with memoryview(self.obj) as view, view[start:stop] as window:
+            return window.tolist()
+
+    def get_column(self, name, start: int, stop: int) -> Sequence:
+        if self.get_ndim() == 1:
+            return self.get_rows(start, stop)
+        return [row[name] for row in self.get_rows(start, stop)]
+
+    def get_columns(self, start: int, stop: int, names: Optional[Iterable] = None) -> dict:
+        if self.get_ndim() == 1:
+            return super().get_columns(start, stop, names)
+        # multidimensional memoryview can not be sliced by columns, so only rows of window are copied
+        rows = self.get_rows(start, stop)
+        known_names = self.get_column_names()
+        if names is None:
+            names = known_names
+        return {n: [r[n] for r in rows] if n in known_names else [None] * len(rows) for n in names}
+
+
+def get_column_source(obj) -> Optional[ColumnSource]:
+    """
+    Recognizes table-like objects by duck typing: NumPy structured arrays (dtype.names),
+    data frames (columns and __array__), objects supporting buffer protocol with 1 or 2 dimensions.
+    """
+    if getattr(getattr(obj, 'dtype', None), 'names', None):
+        return StructuredArraySource(obj)
+    elif hasattr(obj, 'columns') and hasattr(obj, '__array__'):
+        return FrameSource(obj)
+    elif not isinstance(obj, NOT_TABLE_BUFFERS):
+        try:
+            view = memoryview(obj)
+        except TypeError:  # buffer protocol is not supported
+            return None
+        with view:
+            if view.ndim in (1, 2) and view.format.lstrip('@') in NUMBER_FORMATS:
+                return BufferSource(obj)
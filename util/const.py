@@ -9,6 +9,8 @@ MAX_MD_ROW_LEN = 78
 JUPYTER_LINE_LEN = 120
 DEFAULT_LINE_LEN = MAX_MD_ROW_LEN
 
+WRITE_BUFFER_SIZE = 64 * 1024  # chars collected before writing to stream
+
 DEFAULT_FONT_SIZE = 16
 DEFAULT_FONT_PROPORTION = 0.6
 
@@ -2,3 +2,8 @@ try:  # Assume IPython installed
     from IPython.core.display import display, clear_output, Markdown, HTML
 except ImportError:  # Using simple text output
     display, clear_output, Markdown, HTML = print, None, None, None
+
+try:  # Assume NumPy installed
+    import numpy as np
+except ImportError:  # Using arrays from standard library
+    np = None
@@ -1,8 +1,12 @@
-from typing import Iterable, Sized, Optional
-from collections import OrderedDict
+from typing import Iterable, Iterator, Sized, Optional, TextIO
+from itertools import islice
+import re
+from collections import OrderedDict, deque
+from collections.abc import Sequence, Mapping
 
-from util.const import DEFAULT_LINE_LEN, REDUNDANT_SPACING
+from util.const import DEFAULT_LINE_LEN, REDUNDANT_SPACING, WRITE_BUFFER_SIZE
 from util.types import PRIMITIVES
+from util.type_handlers import get_type_handler
 
 
 def is_empty(obj) -> bool:
@@ -33,22 +37,122 @@ def remove_empty_values_from_dict(input_dict: dict, inplace: bool = False) -> di
 
 def remove_redundant_spacing(text: str) -> str:
     for double, single in REDUNDANT_SPACING.items():
-        while double in text:
-            text = text.replace(double, single)
+        if double == single * 2:  # collapse runs of single in one pass
+            text = re.sub(f'(?:{re.escape(single)}){{2,}}', single, text)
+        else:
+            while double in text:
+                text = text.replace(double, single)
     return text
 
 
+def get_split_lines(parts: Iterable[str], delimiter: str = '\n') -> Iterator[str]:
+    # lazy version of ''.join(parts).split(delimiter)
+    buffer = list()
+    for part in parts:
+        if delimiter in part:
+            first, *middle, last = part.split(delimiter)
+            buffer.append(first)
+            yield ''.join(buffer)
+            yield from middle
+            buffer = [last]
+        else:
+            buffer.append(part)
+    yield ''.join(buffer)
+
+
+def write_chunks(fp: TextIO, chunks: Iterable[str], buffer_size: int = WRITE_BUFFER_SIZE) -> int:
+    """
+    Writes text chunks into stream, joining small chunks into blocks of approximately buffer_size chars.
+    :return: count of written chars.
+    """
+    written_len = 0
+    for block in get_buffered_chunks(chunks, buffer_size=buffer_size):
+        fp.write(block)
+        written_len += len(block)
+    return written_len
+
+
+def get_buffered_chunks(chunks: Iterable[str], buffer_size: int = WRITE_BUFFER_SIZE) -> Iterator[str]:
+    # joins small chunks into blocks of approximately buffer_size chars
+    buffer, buffered_len = list(), 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered_len += len(chunk)
+        if buffered_len >= buffer_size:
+            yield ''.join(buffer)
+            buffer, buffered_len = list(), 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def get_joined_chunks(lines: Iterable[str], delimiter: str = '\n') -> Iterator[str]:
+    # lazy version of delimiter.join(lines)
+    is_first = True
+    for line in lines:
+        if is_first:
+            is_first = False
+            yield line
+        else:
+            yield delimiter + line
+
+
+def get_joined_blocks(lines: Iterable[str], lines_per_block: int = 1000, delimiter: str = '\n') -> Iterator[str]:
+    # same text as get_joined_chunks(), but each chunk is a block of many lines joined by one call
+    for n, batch in enumerate(get_batches(lines, lines_per_block)):
+        block = delimiter.join(batch)
+        yield delimiter + block if n else block
+
+
+def get_head_and_tail(items: Iterable, head_count: int, tail_count: int = 0) -> tuple:
+    """
+    Returns first head_count items, count of skipped items and last tail_count items of sized collection.
+    Skipped items are not iterated for sequences and reversible collections (i.e. dict).
+    """
+    count = len(items)
+    tail_count = max(min(tail_count, count - head_count), 0)
+    head = list(islice(items, head_count))
+    if not tail_count:
+        tail = list()
+    elif isinstance(items, Sequence):
+        tail = list(items[count - tail_count:])
+    else:
+        try:
+            tail = list(islice(reversed(items), tail_count))[::-1]
+        except TypeError:  # not reversible, i.e. set
+            tail = list(deque(items, maxlen=tail_count))
+    return head, count - len(head) - len(tail), tail
+
+
+def get_window(items: Iterable, offset: int = 0, limit: Optional[int] = None) -> Iterable:
+    """
+    Returns items from offset to offset + limit without building skipped items:
+    sequences (and other sized objects supporting slices in __getitem__) are sliced,
+    other iterables are skipped ahead by lazy iterator.
+    """
+    stop = None if limit is None else offset + limit
+    if isinstance(items, Sequence):
+        return items[offset:stop]
+    elif hasattr(items, '__getitem__') and hasattr(items, '__len__') and not isinstance(items, Mapping):
+        try:
+            return items[offset:stop]
+        except (TypeError, KeyError):  # slices are not supported
+            pass
+    return islice(items, offset, stop)
+
+
+def get_batches(items: Iterable, batch_size: int) -> Iterator[list]:
+    # lazily splits items to lists of batch_size items (last one can be shorter)
+    assert batch_size > 0, ValueError(f'batch_size must be positive, got {batch_size}')
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        yield batch
+
+
 def get_tech_name(obj):
-    if hasattr(obj, 'tech_name'):
-        return obj.tech_name
-    elif hasattr(obj, 'get_tech_name'):
-        return obj.get_tech_name()
-    elif hasattr(obj, 'id'):
-        return obj.id
-    elif hasattr(obj, 'get_id'):
-        return obj.get_id()
-    elif hasattr(obj, 'get_name_or_str'):
-        return obj.get_name_or_str()
+    return get_type_handler(type(obj)).get_tech_name(obj)
 
 
 def get_hint(obj, max_len: Optional[int] = None) -> str:
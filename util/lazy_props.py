@@ -0,0 +1,98 @@
+from typing import Callable, Iterable, Iterator, Optional, Mapping
+from collections.abc import MutableMapping
+
+from util.aio import check_cancelled, resolve_awaitable
+
+NOT_EVALUATED = object()
+PENDING_STR = '...'
+
+
+class Pending:
+    """
+    Placeholder returned by getter for value which is still evaluated in background (see Prefetcher).
+    Placeholders are not cached by LazyProps, so next access can return actual value.
+    """
+    __slots__ = 'key',
+
+    def __init__(self, key=None):
+        self.key = key
+
+    def __repr__(self):
+        return PENDING_STR
+
+    def __str__(self):
+        return PENDING_STR
+
+
+class LazyProps(MutableMapping):
+    """
+    Ordered mapping of properties with values evaluated by their getters on first access (and cached),
+    so listing keys is cheap and getters of properties never displayed are never called.
+    """
+    __slots__ = '_getters', '_values'
+
+    def __init__(self, getters: Optional[Mapping] = None):
+        self._getters = dict(getters or {})  # key -> getter without args
+        self._values = dict()  # key -> evaluated value
+
+    @classmethod
+    def from_dict(cls, props: Mapping) -> 'LazyProps':
+        lazy_props = cls()
+        lazy_props.update(props)
+        return lazy_props
+
+    def get_getters(self, evaluated: bool = False) -> dict:
+        return {k: g for k, g in self._getters.items() if evaluated or k not in self._values}
+
+    def set_getter(self, key, getter: Callable):
+        self._getters[key] = getter
+        self._values.pop(key, None)
+
+    def update_getters(self, other: 'LazyProps'):
+        # adds keys of other without evaluating its values
+        for key in other:
+            value = other._values.get(key, NOT_EVALUATED)
+            if value is NOT_EVALUATED:
+                self.set_getter(key, other._getters[key])
+            else:
+                self[key] = value
+
+    def is_evaluated(self, key) -> bool:
+        return key in self._values
+
+    def get_evaluated_keys(self) -> Iterable:
+        return [k for k in self._getters if k in self._values]
+
+    def __getitem__(self, key):
+        value = self._values.get(key, NOT_EVALUATED)
+        if value is NOT_EVALUATED:
+            getter = self._getters[key]  # raises KeyError for unknown key
+            check_cancelled()
+            value = resolve_awaitable(getter())
+            if not isinstance(value, Pending):
+                self._values[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._getters[key] = None
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        del self._getters[key]
+        self._values.pop(key, None)
+
+    def __contains__(self, key) -> bool:
+        return key in self._getters
+
+    def __iter__(self) -> Iterator:
+        return iter(self._getters)
+
+    def __reversed__(self) -> Iterator:
+        return reversed(self._getters)
+
+    def __len__(self) -> int:
+        return len(self._getters)
+
+    def __repr__(self):
+        items = ', '.join(f'{k!r}: {self._values[k]!r}' if k in self._values else f'{k!r}: ...' for k in self)
+        return f'{self.__class__.__name__}({{{items}}})'
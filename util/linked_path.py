@@ -0,0 +1,80 @@
+from typing import Optional, Iterable, Union
+
+from util.const import PATH_DELIMITER
+
+
+class LinkedPath:
+    """
+    Persistent path: last name with link to parent path, so paths of children share the path of their parent.
+    Extending path takes constant time and memory, list or string are built only on demand.
+    """
+    __slots__ = '_parent', '_name', '_len'
+
+    def __init__(self, name, parent: Optional['LinkedPath'] = None):
+        self._parent = parent
+        self._name = name
+        self._len = len(parent) + 1 if parent is not None else 1
+
+    @classmethod
+    def from_list(cls, path: Union[Iterable, str, 'LinkedPath', None]) -> Optional['LinkedPath']:
+        # returns None for empty path
+        if path is None or isinstance(path, LinkedPath):
+            return path
+        elif isinstance(path, str):
+            path = path.split(PATH_DELIMITER) if path else []
+        linked = None
+        for name in path:
+            linked = LinkedPath(name, parent=linked)
+        return linked
+
+    def get_child(self, name) -> 'LinkedPath':
+        return LinkedPath(name, parent=self)
+
+    def get_parent(self) -> Optional['LinkedPath']:
+        return self._parent
+
+    def get_name(self):
+        return self._name
+
+    def get_list(self) -> list:
+        names = [None] * self._len
+        node = self
+        for n in range(self._len - 1, -1, -1):
+            names[n] = node._name
+            node = node._parent
+        return names
+
+    def get_str(self, delimiter: str = PATH_DELIMITER) -> str:
+        return delimiter.join(map(str, self.get_list()))
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return iter(self.get_list())
+
+    def __eq__(self, other):
+        if isinstance(other, LinkedPath):
+            a, b = self, other
+            if a._len != b._len:
+                return False
+            while a is not None:
+                if a is b:  # shared prefix
+                    return True
+                if a._name != b._name:
+                    return False
+                a, b = a._parent, b._parent
+            return True
+        elif isinstance(other, (list, tuple)):
+            return self._len == len(other) and self.get_list() == list(other)
+        else:
+            return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self.get_list()))
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.get_list()})'
+
+    def __str__(self):
+        return self.get_str()
@@ -0,0 +1,128 @@
+from typing import Optional, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError
+from threading import Lock
+from time import monotonic, perf_counter
+
+from util.lazy_props import LazyProps, Pending
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 0.5  # seconds
+
+
+class PropertyStats:
+    """
+    Thread-safe durations of property getters and count of timeouts by (class name, property name).
+    """
+
+    def __init__(self):
+        self._records = dict()  # (owner, key) -> [count, total_seconds, max_seconds, timeouts]
+        self._lock = Lock()
+
+    def _get_record(self, owner: str, key) -> list:
+        record = self._records.get((owner, key))
+        if record is None:
+            record = [0, 0.0, 0.0, 0]
+            self._records[owner, key] = record
+        return record
+
+    def add_duration(self, owner: str, key, seconds: float):
+        with self._lock:
+            record = self._get_record(owner, key)
+            record[0] += 1
+            record[1] += seconds
+            record[2] = max(record[2], seconds)
+
+    def add_timeout(self, owner: str, key):
+        with self._lock:
+            self._get_record(owner, key)[3] += 1
+
+    def get_records(self, min_seconds: float = 0.0) -> list:
+        """
+        Returns list of dicts for properties with max duration not less than min_seconds (or timed out),
+        slowest first, i.e. for TableViewer.
+        """
+        with self._lock:
+            items = list(self._records.items())
+        records = list()
+        for (owner, key), (count, total, max_seconds, timeouts) in items:
+            if max_seconds >= min_seconds or timeouts:
+                records.append(dict(
+                    owner=owner, property=key, count=count,
+                    mean=total / count if count else None, max=max_seconds, timeouts=timeouts,
+                ))
+        return sorted(records, key=lambda r: (r['timeouts'], r['max']), reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+
+
+class PrefetchedGetter:
+    # waits for value calculated in thread pool, but not longer than deadline
+    __slots__ = '_future', '_deadline', '_on_timeout', '_key'
+
+    def __init__(self, future: Future, deadline: float, key, on_timeout: Optional[Callable] = None):
+        self._future = future
+        self._deadline = deadline
+        self._key = key
+        self._on_timeout = on_timeout
+
+    def __call__(self):
+        try:
+            return self._future.result(timeout=max(self._deadline - monotonic(), 0))
+        except TimeoutError:
+            if self._on_timeout:
+                self._on_timeout()
+            return Pending(self._key)
+
+
+class Prefetcher:
+    """
+    Evaluates values of LazyProps concurrently in thread pool.
+    Access to each prefetched value waits no longer than timeout (counted from prefetch),
+    Pending placeholder is returned for value still being evaluated.
+    """
+
+    def __init__(
+            self,
+            max_workers: int = DEFAULT_MAX_WORKERS,
+            timeout: Optional[float] = DEFAULT_TIMEOUT,
+            stats: Optional[PropertyStats] = None,
+    ):
+        self.timeout = timeout
+        self.stats = stats or PropertyStats()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+
+    def prefetch(self, props: LazyProps, owner: str = '', keys: Optional[Iterable] = None) -> LazyProps:
+        """
+        Starts evaluation of not evaluated props in background.
+        :param keys: only these props are prefetched (i.e. props shown by viewer), all props if None.
+        """
+        deadline = monotonic() + self.timeout if self.timeout is not None else float('inf')
+        getters = props.get_getters()
+        if keys is not None:
+            getters = {k: getters[k] for k in keys if k in getters}
+        for key, getter in getters.items():
+            future = self._executor.submit(self._get_value, getter, owner, key)
+            on_timeout = self._get_timeout_callback(owner, key)
+            props.set_getter(key, PrefetchedGetter(future, deadline, key, on_timeout=on_timeout))
+        return props
+
+    def _get_value(self, getter: Callable, owner: str, key):
+        start = perf_counter()
+        try:
+            return getter()
+        finally:
+            self.stats.add_duration(owner, key, perf_counter() - start)
+
+    def _get_timeout_callback(self, owner: str, key) -> Callable:
+        return lambda: self.stats.add_timeout(owner, key)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown(wait=False)
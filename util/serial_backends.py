@@ -0,0 +1,126 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+import json
+import yaml
+
+try:  # libyaml bindings are optional
+    from yaml import CSafeDumper, CSafeLoader
+except ImportError:
+    CSafeDumper, CSafeLoader = None, None
+try:  # fast json codec is optional
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class IndentDumper(yaml.SafeDumper):
+    # increase indent according Ansible style: https://habr.com/ru/articles/669684/
+    def increase_indent(self, flow=False, indentless=False):
+        return super(IndentDumper, self).increase_indent(flow, indentless=False)
+
+
+class SerialBackend(ABC):
+    """
+    Codec used by SerialView for dumping and loading of serializable data.
+    All backends of one format load the same data,
+    but only exact backends dump text byte-identical to the pure Python implementation.
+    """
+    name = None
+    serial_format = None
+    exact = True
+
+    def is_available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def dumps(self, data) -> str:
+        pass
+
+    @abstractmethod
+    def loads(self, text: str):
+        pass
+
+
+class JsonBackend(SerialBackend):
+    name = 'json'
+    serial_format = 'json'
+
+    def dumps(self, data) -> str:
+        return json.dumps(data, ensure_ascii=False)
+
+    def loads(self, text: str):
+        return json.loads(text)
+
+
+class OrjsonBackend(JsonBackend):
+    # compact separators, NaN dumped as null, integers limited to 64 bits
+    name = 'orjson'
+    exact = False
+
+    def is_available(self) -> bool:
+        return orjson is not None
+
+    def dumps(self, data) -> str:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode('utf8')
+        except TypeError:  # i.e. too big integer
+            return super().dumps(data)
+
+    def loads(self, text: str):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:  # NaN, Infinity and too big integers are not supported
+            return super().loads(text)
+
+
+class YamlBackend(SerialBackend):
+    name = 'pyyaml'
+    serial_format = 'yaml'
+    dumper = IndentDumper
+    loader = yaml.SafeLoader
+
+    def dumps(self, data) -> str:
+        return yaml.dump(data, Dumper=self.dumper, allow_unicode=True, sort_keys=False)
+
+    def loads(self, text: str):
+        return yaml.load(text, Loader=self.loader)
+
+
+class LibyamlBackend(YamlBackend):
+    # libyaml emitter can not indent sequences inside mappings like IndentDumper does
+    name = 'libyaml'
+    exact = False
+    dumper = CSafeDumper
+    loader = CSafeLoader
+
+    def is_available(self) -> bool:
+        return CSafeLoader is not None
+
+
+SERIAL_BACKENDS = dict(  # in order of preference
+    json=[OrjsonBackend(), JsonBackend()],
+    yaml=[LibyamlBackend(), YamlBackend()],
+)
+
+
+def get_serial_backends(serial_format: str, exact: bool = False, available: bool = True) -> list:
+    assert serial_format in SERIAL_BACKENDS, ValueError(f'unsupported format: {serial_format}')
+    backends = list()
+    for backend in SERIAL_BACKENDS[serial_format]:
+        if exact and not backend.exact:
+            continue
+        if available and not backend.is_available():
+            continue
+        backends.append(backend)
+    return backends
+
+
+def get_serial_backend(serial_format: str, exact: bool = False, name: Optional[str] = None) -> SerialBackend:
+    """
+    Returns fastest available backend for serial_format ('json' or 'yaml'), or backend with specified name.
+    :param exact: require dumps() byte-identical to pure Python implementation.
+    """
+    for backend in get_serial_backends(serial_format, exact=exact):
+        if name is None or backend.name == name:
+            return backend
+    raise ValueError(f'{serial_format}-backend {name or ""} is not available (exact={exact})')
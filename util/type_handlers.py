@@ -0,0 +1,389 @@
+from typing import Optional, Union, Iterable, Callable, Any
+from collections import OrderedDict
+from functools import partial
+from weakref import WeakKeyDictionary
+from threading import Lock
+
+from util.types import Class, PRIMITIVES, ARRAY_TYPES
+from util.lazy_props import LazyProps
+
+MISSING = object()  # marker for properties not found by handler
+
+_registered_handlers = dict()  # class -> handler, as registered
+_resolved_handlers = WeakKeyDictionary()  # concrete class -> handler, resolved by MRO
+_class_layouts = WeakKeyDictionary()  # class -> ClassLayout, dropped together with (redefined) class
+_accessors = WeakKeyDictionary()  # class -> {name: accessor}, see get_accessor()
+_name_indexes = OrderedDict()  # id(array) -> (len(array), {tech_name: position}), see get_name_index()
+_name_indexes_lock = Lock()
+
+NAME_INDEX_MIN_LEN = 16  # shorter arrays are scanned without index
+NAME_INDEX_MAX_COUNT = 256  # number of indexed arrays, least recently used are dropped
+
+
+class TypeHandler:
+    """
+    Describes how objects of some class can be introspected by CommonWrapper and get_tech_name().
+    Default implementation probes object attributes (slow but universal),
+    subclasses provide fast paths for known types and can be registered via register_type_handler().
+    """
+    is_primitive = False
+    is_class = False
+    is_dict = False
+    is_array = False
+    is_set = False
+
+    def is_container(self) -> bool:
+        return self.is_dict or self.is_array or self.is_set
+
+    def get_tech_name(self, obj) -> Optional[str]:
+        if hasattr(obj, 'tech_name'):
+            return obj.tech_name
+        elif hasattr(obj, 'get_tech_name'):
+            return obj.get_tech_name()
+        elif hasattr(obj, 'id'):
+            return obj.id
+        elif hasattr(obj, 'get_id'):
+            return obj.get_id()
+        elif hasattr(obj, 'get_name_or_str'):
+            return obj.get_name_or_str()
+
+    def get_name_or_str(self, obj) -> Optional[str]:
+        if hasattr(obj, 'get_name_or_str'):
+            return obj.get_name_or_str()
+
+    def get_props(self, obj, wrapper, including_protected: bool = False) -> dict:
+        if hasattr(obj, '__dict__'):
+            props = OrderedDict()
+            for i in wrapper.get_raw_property_names(including_protected=including_protected):
+                props[i] = getattr(obj, i)
+            return props
+        else:
+            return dict(data=obj)
+
+    def get_lazy_props(self, obj, wrapper, including_protected: bool = False) -> LazyProps:
+        # same props as get_props() returns, subclasses can defer evaluation of values
+        return LazyProps.from_dict(self.get_props(obj, wrapper, including_protected=including_protected))
+
+    def get_prop_names(self, obj, wrapper, including_protected: bool = False) -> Iterable:
+        return self.get_props(obj, wrapper, including_protected=including_protected).keys()
+
+    def get_item(self, obj, name) -> Any:
+        return MISSING
+
+    def get_accessor(self, name) -> Optional[Callable]:
+        """
+        Returns fast getter of property by name for objects of handled class,
+        getter returns MISSING if property must be resolved by wrapper (see CommonWrapper.get_raw_property()),
+        None means that property is always resolved by wrapper.
+        """
+        if isinstance(name, str):
+            return partial(_get_attribute, name)
+
+
+class ObjectHandler(TypeHandler):
+    def get_lazy_props(self, obj, wrapper, including_protected: bool = False) -> LazyProps:
+        if hasattr(obj, '__dict__'):
+            props = LazyProps()
+            for i in wrapper.get_raw_property_names(including_protected=including_protected):
+                props.set_getter(i, partial(getattr, obj, i))
+            return props
+        else:
+            return super().get_lazy_props(obj, wrapper, including_protected=including_protected)
+
+    def get_prop_names(self, obj, wrapper, including_protected: bool = False) -> Iterable:
+        # same keys as get_props() returns, but without calling property getters
+        if hasattr(obj, '__dict__'):
+            return wrapper.get_raw_property_names(including_protected=including_protected)
+        else:
+            return ['data']
+
+
+class PropsHandler(TypeHandler):
+    # objects providing their own get_props() method, i.e. Entity
+    def get_props(self, obj, wrapper, including_protected: bool = False) -> dict:
+        return obj.get_props()
+
+
+class BuiltinTypeHandler(TypeHandler):
+    """
+    Fast paths for instances of built-in types,
+    subclasses of these types can provide their own protocol (tech_name, get_props(), as Entity does),
+    which is checked first as for any other object.
+    """
+    builtin_types = ()
+
+    def is_builtin(self, obj) -> bool:
+        return type(obj) in self.builtin_types
+
+    def get_tech_name(self, obj) -> Optional[str]:
+        if self.is_builtin(obj):
+            return None
+        return super().get_tech_name(obj)
+
+    def get_name_or_str(self, obj) -> Optional[str]:
+        if self.is_builtin(obj):
+            return None
+        return super().get_name_or_str(obj)
+
+    def get_props(self, obj, wrapper, including_protected: bool = False) -> dict:
+        if not self.is_builtin(obj) and hasattr(obj, 'get_props'):
+            return obj.get_props()
+        return self.get_builtin_props(obj)
+
+    def get_builtin_props(self, obj) -> dict:
+        return dict(data=obj)
+
+
+class PrimitiveHandler(BuiltinTypeHandler):
+    is_primitive = True
+    builtin_types = PRIMITIVES
+
+    def get_name_or_str(self, obj) -> str:
+        return str(obj)
+
+
+class ClassHandler(ObjectHandler):
+    is_class = True
+
+
+class DictHandler(BuiltinTypeHandler):
+    is_dict = True
+    builtin_types = dict, OrderedDict
+
+    def get_builtin_props(self, obj) -> dict:
+        return obj
+
+    def get_item(self, obj: dict, name) -> Any:
+        if name in obj:
+            return obj[name]
+        return MISSING
+
+    def get_accessor(self, name) -> Callable:
+        return partial(_get_dict_item, name)
+
+
+class ArrayHandler(BuiltinTypeHandler):
+    is_array = True
+    builtin_types = ARRAY_TYPES
+
+    def get_builtin_props(self, obj) -> dict:
+        props = OrderedDict()
+        for n, i in enumerate(obj):
+            props[n] = i
+        return props
+
+    def get_item(self, obj: Union[list, tuple], name) -> Any:
+        if isinstance(name, str):
+            if name.isnumeric():
+                name = int(name)
+        if isinstance(name, int):
+            return obj[name]
+        if len(obj) >= NAME_INDEX_MIN_LEN:
+            try:
+                return _get_item_by_name_index(obj, name)
+            except TypeError:  # unhashable name
+                pass
+        return _get_item_by_scan(obj, name)
+
+    def get_accessor(self, name) -> None:
+        return None
+
+
+class SetHandler(BuiltinTypeHandler):
+    is_set = True
+    builtin_types = (set, )
+
+
+class ClassLayout:
+    """
+    Class-level part of introspection of instances:
+    attribute names in order of object.__dir__() and names of properties.
+    """
+
+    def __init__(self, cls: Class):
+        names = dict()
+        self._merge_class_names(names, cls)
+        self.attribute_names = tuple(names)
+        self.public_attribute_names = tuple(n for n in self.attribute_names if not n.startswith('_'))
+        self.property_names = tuple(n for n in self.attribute_names if isinstance(getattr(cls, n, None), property))
+        self.public_property_names = tuple(n for n in self.property_names if not n.startswith('_'))
+
+    @classmethod
+    def _merge_class_names(cls, names: dict, klass: Class):
+        # repeats merge_class_dict() from object.__dir__() implementation
+        for n in vars(klass):
+            names[n] = None
+        for base in klass.__bases__:
+            cls._merge_class_names(names, base)
+
+    def get_attribute_names(self, obj, including_protected: bool = False) -> list:
+        class_names = self.attribute_names if including_protected else self.public_attribute_names
+        instance_dict = getattr(obj, '__dict__', None)
+        if not instance_dict:
+            return list(class_names)
+        names = [n for n in instance_dict if including_protected or not n.startswith('_')]
+        names += [n for n in class_names if n not in instance_dict]
+        return names
+
+    def get_property_names(self, including_protected: bool = False) -> tuple:
+        return self.property_names if including_protected else self.public_property_names
+
+
+def get_class_layout(cls: Class) -> Optional[ClassLayout]:
+    """
+    Returns cached ClassLayout for instances of cls,
+    or None if its instances can not be described by class (i.e. they customize __dir__()).
+    Layout is computed on first use and is not updated after changing attributes of class (or its bases),
+    so after monkey-patching of already used class call clear_class_layouts(cls).
+    """
+    if cls.__dir__ is not object.__dir__:
+        return None
+    layout = _class_layouts.get(cls)
+    if layout is None:
+        layout = ClassLayout(cls)
+        _class_layouts[cls] = layout
+    return layout
+
+
+def clear_class_layouts(cls: Optional[Class] = None) -> None:
+    """
+    Drops cached layouts after adding, removing or replacing attributes of existing class (monkey-patching).
+    :param cls: patched class, layouts of its subclasses are dropped too; all layouts are dropped if None.
+    """
+    if cls is None:
+        _class_layouts.clear()
+    else:
+        for klass in list(_class_layouts.keys()):
+            if issubclass(klass, cls):
+                _class_layouts.pop(klass, None)
+
+
+def _get_attribute(name: str, obj) -> Any:
+    try:
+        return getattr(obj, name)
+    except AttributeError:
+        return MISSING
+
+
+def _get_dict_item(name, obj: dict) -> Any:
+    return obj.get(name, MISSING)
+
+
+def get_accessor(cls: Class, name) -> Optional[Callable]:
+    """
+    Returns cached accessor of property by name for instances of cls, see TypeHandler.get_accessor().
+    """
+    class_accessors = _accessors.get(cls)
+    if class_accessors is None:
+        class_accessors = dict()
+        _accessors[cls] = class_accessors
+    if name in class_accessors:
+        return class_accessors[name]
+    accessor = get_type_handler(cls).get_accessor(name)
+    class_accessors[name] = accessor
+    return accessor
+
+
+def get_name_index(obj: Union[list, tuple], rebuild: bool = False) -> dict:
+    """
+    Returns mapping from tech_name to position of (first) item with this name in array, builds it on first request.
+    Lists and tuples can not be weakly referenced, so index is kept by id() of array for limited number of arrays,
+    without reference to array itself, and it is rebuilt only when length of array changed.
+    After replacing, renaming or reordering items in place call invalidate_name_index(obj),
+    otherwise new names are not found.
+    """
+    key = id(obj)
+    with _name_indexes_lock:  # arrays are looked up from prefetch threads too
+        entry = _name_indexes.get(key)
+        if not rebuild and entry is not None and entry[0] == len(obj):
+            _name_indexes.move_to_end(key)
+            return entry[1]
+    index = dict()
+    for n, i in enumerate(obj):
+        if hasattr(i, 'tech_name'):
+            try:
+                index.setdefault(i.tech_name, n)
+            except TypeError:  # unhashable tech_name
+                pass
+    with _name_indexes_lock:
+        _name_indexes[key] = len(obj), index
+        _name_indexes.move_to_end(key)
+        while len(_name_indexes) > NAME_INDEX_MAX_COUNT:
+            _name_indexes.popitem(last=False)
+    return index
+
+
+def _get_item_by_name_index(obj: Union[list, tuple], name) -> Any:
+    # missing name is trusted to index, found item is checked by its current name (index can be stale)
+    position = get_name_index(obj).get(name)
+    if position is None:
+        return MISSING
+    item = obj[position]
+    if getattr(item, 'tech_name', MISSING) == name:
+        return item
+    return _get_item_by_scan(obj, name)
+
+
+def _get_item_by_scan(obj: Iterable, name) -> Any:
+    for i in obj:
+        if hasattr(i, 'tech_name'):
+            if i.tech_name == name:
+                return i
+    return MISSING
+
+
+def invalidate_name_index(obj: Union[list, tuple, None] = None) -> None:
+    if obj is None:
+        _name_indexes.clear()
+    else:
+        _name_indexes.pop(id(obj), None)
+
+
+DEFAULT_HANDLER = ObjectHandler()
+PROPS_HANDLER = PropsHandler()
+
+
+def register_type_handler(cls: Class, handler: TypeHandler) -> None:
+    """
+    Registers handler for cls and its subclasses (nearest class in MRO wins).
+    :param cls: class of objects to handle.
+    :param handler: instance of TypeHandler (or its subclass) with fast paths for this class.
+    """
+    assert isinstance(handler, TypeHandler), TypeError(f'expected TypeHandler, got {handler}')
+    _registered_handlers[cls] = handler
+    _resolved_handlers.clear()
+    _accessors.clear()
+
+
+def unregister_type_handler(cls: Class) -> Optional[TypeHandler]:
+    handler = _registered_handlers.pop(cls, None)
+    _resolved_handlers.clear()
+    _accessors.clear()
+    return handler
+
+
+def get_type_handler(cls: Class) -> TypeHandler:
+    handler = _resolved_handlers.get(cls)
+    if handler is None:
+        handler = _resolve_type_handler(cls)
+        _resolved_handlers[cls] = handler
+    return handler
+
+
+def _resolve_type_handler(cls: Class) -> TypeHandler:
+    for parent in cls.__mro__:
+        if parent in _registered_handlers:
+            return _registered_handlers[parent]
+    if hasattr(cls, 'get_props'):
+        return PROPS_HANDLER
+    else:
+        return DEFAULT_HANDLER
+
+
+for _cls in PRIMITIVES:
+    register_type_handler(_cls, PrimitiveHandler())
+for _cls in ARRAY_TYPES:
+    register_type_handler(_cls, ArrayHandler())
+register_type_handler(dict, DictHandler())
+register_type_handler(set, SetHandler())
+register_type_handler(type, ClassHandler())
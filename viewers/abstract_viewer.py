@@ -1,13 +1,23 @@
 from abc import ABC
 
+from util.aio import run_in_thread, check_cancelled
 from interfaces.viewer_interface import ViewerInterface as Viewer
+from interfaces.view_interface import ViewInterface as View
 from abstract.common_abstract import CommonAbstract as Abstract
 from wrappers.common_wrapper import CommonWrapper as Wrapper
 
 
 class AbstractViewer(Abstract, Viewer, ABC):
+    async def aget_view(self, obj, *args, **kwargs) -> View:
+        """
+        Async version of get_view(): prepares view in thread without blocking event loop,
+        awaits awaitable property values in this event loop, stops on cancellation.
+        """
+        return await run_in_thread(self.get_view, obj, *args, **kwargs)
+
     @staticmethod
     def _get_wrapped_object(obj) -> Wrapper:
+        check_cancelled()
         if not isinstance(obj, Wrapper):
             obj = Wrapper.wrap(obj)
         return obj
@@ -1,11 +1,16 @@
-from typing import Iterable
+from typing import Iterable, Optional
 
 from util.types import PRIMITIVES
+from util.functions import crop
 from views.text_view import TextView
 from viewers.text_viewer import TextViewer
 
 
 class OneLineTextViewer(TextViewer):
+    def __init__(self, max_len: Optional[int] = None):
+        super().__init__()
+        self.max_len = max_len  # items of collection are not iterated after line became longer than max_len
+
     def get_view(self, obj) -> TextView:
         data = self._get_data_from(obj)
         line = ''
@@ -17,11 +22,15 @@ class OneLineTextViewer(TextViewer):
             line = data.get_text()
         elif isinstance(data, dict):
             for k, v in data.items():
+                if self._is_full(line):
+                    break
                 if line:
                     line += ', '
                 line += f'{k}: {v}'
         elif isinstance(data, Iterable) and not isinstance(data, str):  ###
             for i in data:
+                if self._is_full(line):
+                    break
                 if line:
                     line += ', '
                 line += repr(i)
@@ -44,4 +53,9 @@ class OneLineTextViewer(TextViewer):
             line = name
         else:
             line = str(data)
+        if self.max_len is not None:
+            line = crop(line, self.max_len)
         return TextView([line])
+
+    def _is_full(self, line: str) -> bool:
+        return self.max_len is not None and len(line) > self.max_len
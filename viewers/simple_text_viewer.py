@@ -3,6 +3,7 @@ from typing import Iterable
 
 from util.const import INDENT, MAX_MD_ROW_LEN
 from util.functions import crop
+from util.lazy_props import LazyProps
 from wrappers.common_wrapper import CommonWrapper
 from viewers.text_viewer import TextViewer
 from viewers.one_line_text_viewer import OneLineTextViewer
@@ -17,7 +18,7 @@ class SimpleTextViewer(TextViewer):
         return TextView(lines)
 
     def get_lines(self, obj, depth: int = 1, indent: str = INDENT, max_line_len: int = MAX_MD_ROW_LEN) -> Iterable[str]:
-        if isinstance(obj, dict):
+        if isinstance(obj, (dict, LazyProps)):
             for k, v in obj.items():
                 wrapped_v = CommonWrapper(v)
                 v_repr = wrapped_v.get_view(OneLineTextViewer())
@@ -37,7 +38,7 @@ class SimpleTextViewer(TextViewer):
             if depth > 0:
                 obj = self._get_wrapped_object(obj)
                 assert isinstance(obj, CommonWrapper)
-                props = obj.get_props()
+                props = obj.prefetch_props(obj.get_props(lazy=True))
                 for line in self.get_lines(props, depth=depth-1):
                     yield crop(indent + line, max_line_len)
 
@@ -53,5 +54,5 @@ class SimpleTextViewer(TextViewer):
         obj = self._get_wrapped_object(obj)
         assert isinstance(obj, CommonWrapper)
         yield 'data', obj.get_data()
-        yield 'props', obj.get_props()
+        yield 'props', obj.prefetch_props(obj.get_props(lazy=True))
         yield 'methods', obj.get_methods()
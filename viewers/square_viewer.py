@@ -5,6 +5,7 @@ from util.functions import crop, get_repr
 from visual import Unit, Size1d, Size2d, Style, TagType
 from views.formatted_view import FormattedView
 from views.square_view import SquareView
+from views.tape_view import TapeView
 from viewers.tree_viewer import TreeViewer
 
 HINT_LEN = MAX_MD_ROW_LEN
@@ -90,6 +91,10 @@ class SquareViewer(TreeViewer):
             view = self._get_vertical_view(obj, size=size, style=style, depth=depth, include_title=include_title)
         return view
 
+    def get_tape(self, obj, depth: Optional[int] = None) -> TapeView:
+        view = self.get_view(obj, depth=depth)
+        return TapeView.from_view(view)
+
     def _get_empty_view(self, obj, size: Size2d, style: Style) -> SquareView:
         one_line = self._get_one_line(obj)
         style = style + Style(background='gray')
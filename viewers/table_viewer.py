@@ -1,61 +1,227 @@
-from typing import Optional, Iterable, Callable, Union
+from typing import Optional, Iterable, Iterator, Callable, Union, Sized
+from itertools import chain, islice
+from collections import deque
+from collections.abc import Sequence
+from operator import length_hint
+from math import ceil
+from functools import partial
+from enum import Enum
 
-from util.types import COLLECTION_TYPES
-from util.functions import get_hint
-from views.table_view import TableView
+from util.const import PATH_DELIMITER
+from util.types import COLLECTION_TYPES, ARRAY_TYPES, Array
+from util.functions import get_hint, get_batches, get_window
+from util.lazy_props import LazyProps
+from util.column_sources import ColumnSource, get_column_source
+from views.table_view import TableView, StreamingTableView
+from views.columnar_table_view import ColumnarTableView
 from viewers.text_viewer import TextViewer
 from viewers.one_line_text_viewer import OneLineTextViewer
 from viewers.tree_viewer import TreeViewer
 
 DEFAULT_COLUMN_NAMES = 'field', 'hint', 'value'
+DEFAULT_SAMPLE_SIZE = 100  # records used for columns of streaming table
+DEFAULT_PAGE_SIZE = 50
+EXTRA_COLUMN_NAME = 'other fields'
+
+
+class LateColumnsPolicy(Enum):
+    Ignore = 'ignore'  # fields missing in sampled records are not shown
+    Extra = 'extra'  # fields missing in sampled records are shown in additional column
+    Error = 'error'  # ValueError is raised while rendering
 
 
 class TableViewer(TextViewer):
     _get_one_line = OneLineTextViewer().get_view
     _get_list_view = TreeViewer(depth=1).get_view
 
-    def __init__(self, depth: bool = False):
+    def __init__(
+            self,
+            depth: bool = False,
+            stream: bool = False,
+            sample_size: int = DEFAULT_SAMPLE_SIZE,
+            late_columns: Union[LateColumnsPolicy, str] = LateColumnsPolicy.Ignore,
+            columns: Optional[Iterable[Union[str, Array]]] = None,
+            columnar: bool = False,
+            formats: Optional[dict] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+    ):
+        """
+        :param depth: show values as lists (TreeViewer with depth 1) instead of one line.
+        :param stream: build StreamingTableView over iterable of records lazily (in constant memory),
+        columns are taken from first sample_size records.
+        :param sample_size: count of first records used for columns of streaming table.
+        :param late_columns: what to do with fields appeared after sample (in streaming mode).
+        :param columns: names or paths (i.e. 'owner.name') of shown columns for table of records,
+        only these values are taken from records (see CommonWrapper.get_raw_node()) and formatted.
+        :param columnar: build ColumnarTableView (not in streaming mode), int and float values are kept as is,
+        so numeric columns are stored in typed arrays and formatted by whole column.
+        :param formats: ColumnFormat by column name for columnar table, i.e. dict(share=ColumnFormat(percent=True)).
+        :param offset: count of skipped first rows (records, fields of object or rows of array-like source).
+        :param limit: max count of shown rows after offset, only this window of rows is taken from source:
+        sequences are sliced, iterators are skipped ahead (see get_window()),
+        array-like sources (NumPy arrays, data frames, buffers, see get_column_source()) are read by columns.
+        """
         super().__init__()
         self.depth = depth
+        self.stream = stream
+        self.sample_size = sample_size
+        self.late_columns = LateColumnsPolicy(late_columns)
+        self.columns = columns
+        self.columnar = columnar
+        self.formats = formats
+        self.offset = offset
+        self.limit = limit
 
     def get_view(
             self,
             obj,
             depth: Optional[bool] = None,
+            columns: Optional[Iterable[Union[str, Array]]] = None,
+            offset: Optional[int] = None,
+            limit: Optional[int] = None,
     ) -> TableView:
         if depth is None:
             depth = self.depth
+        if columns is None:
+            columns = self.columns
+        if offset is None:
+            offset = self.offset
+        if limit is None:
+            limit = self.limit
+        source = get_column_source(obj)
+        if source is not None:
+            return self._get_source_view(source, columns, offset=offset, limit=limit)
+        is_window = offset or limit is not None
+        if is_window and isinstance(obj, (*COLLECTION_TYPES, Iterator, Sequence)) and not isinstance(obj, str):
+            obj = get_window(obj, offset, limit)  # skipped rows are not wrapped and formatted
+            if not self.stream:
+                obj = list(obj)
         if depth:
             cell_getter = self._get_list_view
         else:
             cell_getter = self._get_one_line
-        if isinstance(obj, COLLECTION_TYPES) and not isinstance(obj, str):
+        if self.columnar and not self.stream:
+            cell_getter = partial(self._get_typed_cell, cell_getter)
+        if columns is not None and isinstance(obj, (*COLLECTION_TYPES, Iterator)):
+            column_names = [c if isinstance(c, str) else PATH_DELIMITER.join(map(str, c)) for c in columns]
+            rows = self._get_projected_rows(obj, columns, cell_getter)
+            if self.stream:
+                return StreamingTableView(data=rows, columns=column_names)
+            else:
+                return self._get_table_view(list(rows), column_names)
+        elif self.stream and isinstance(obj, (*COLLECTION_TYPES, Iterator)):
+            return self._get_streaming_view(obj, cell_getter)
+        elif isinstance(obj, COLLECTION_TYPES) and not isinstance(obj, str):
             records = list(self._get_table_records_from_iter(obj, cell_getter))
             columns = list(self._get_columns_from_records(records))
             rows = list(self._get_rows_from_records(records, columns))
-        elif isinstance(obj, dict):
+        elif isinstance(obj, (dict, LazyProps)):
             columns = DEFAULT_COLUMN_NAMES
-            rows = list(self._get_table_rows_from_dict(obj, cell_getter))
+            fields = get_window(obj, offset, limit) if is_window else None
+            rows = list(self._get_table_rows_from_dict(obj, cell_getter, fields=fields))
         else:
             obj = self._get_wrapped_object(obj)
-            props = obj.get_props()
-            return self.get_view(props, depth=depth)
-        return TableView(data=rows, columns=columns)
+            props = obj.get_props(lazy=True)
+            obj.prefetch_props(props, keys=list(get_window(props, offset, limit)) if is_window else None)
+            return self.get_view(props, depth=depth, columns=columns, offset=offset, limit=limit)
+        return self._get_table_view(rows, columns)
+
+    def get_page(self, obj, number: int, page_size: int = DEFAULT_PAGE_SIZE) -> TableView:
+        # for one-pass iterator use get_pager(), it remembers position of iterator between pages
+        return self.get_view(obj, offset=number * page_size, limit=page_size)
+
+    def get_pager(self, obj, page_size: int = DEFAULT_PAGE_SIZE) -> 'TablePager':
+        return TablePager(self, obj, page_size=page_size)
+
+    def _get_source_view(
+            self,
+            source: ColumnSource,
+            columns: Optional[Iterable] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+    ) -> ColumnarTableView:
+        if columns is not None:  # names of columns, i.e. numbers for 2-dimensional arrays
+            columns = [PATH_DELIMITER.join(map(str, c)) if isinstance(c, ARRAY_TYPES) else c for c in columns]
+        count = source.get_count()
+        stop = count if limit is None else min(offset + limit, count)
+        data = source.get_columns(min(offset, stop), stop, names=columns)
+        return ColumnarTableView(data=data, formats=self.formats)
+
+    def _get_table_view(self, rows: list, columns: Union[list, tuple]) -> TableView:
+        if self.columnar:
+            return ColumnarTableView(data=rows, columns=list(columns), formats=self.formats)
+        else:
+            return TableView(data=rows, columns=columns)
+
+    @staticmethod
+    def _get_typed_cell(cell_getter: Callable, value):
+        # numbers are kept for typed columns of ColumnarTableView, their one-line views are the same str()
+        if type(value) in (int, float):
+            return value
+        return cell_getter(value)
 
     def _get_table_records_from_iter(self, obj: Iterable, cell_getter: Optional[Callable] = None) -> Iterable[dict]:
         if not cell_getter:
             cell_getter = self._get_one_line
+        records = list()
+        for i in obj:  # all props are shown, props of all records are prefetched together
+            wrapped = self._get_wrapped_object(i)
+            records.append(wrapped.prefetch_props(wrapped.get_props(lazy=True)))
+        for props in records:
+            yield {k: cell_getter(v) for k, v in props.items()}
+
+    def _get_projected_rows(self, obj: Iterable, columns: Iterable, cell_getter: Callable) -> Iterator[tuple]:
+        # only values of columns are taken from records and formatted, without get_props()
+        paths = [c.split(PATH_DELIMITER) if isinstance(c, str) else list(c) for c in columns]
         for i in obj:
-            yield {
-                k: cell_getter(v)
-                for k, v in
-                self._get_wrapped_object(i).get_props().items()
-            }
+            wrapped = self._get_wrapped_object(i)
+            yield tuple(self._get_projected_cell(wrapped, path, cell_getter) for path in paths)
+
+    @staticmethod
+    def _get_projected_cell(wrapped, path: list, cell_getter: Callable):
+        try:
+            value = wrapped.get_raw_node(path)
+        except (ValueError, IndexError):  # not found
+            return None
+        return cell_getter(value)
+
+    def _get_streaming_view(self, obj: Iterable, cell_getter: Callable) -> StreamingTableView:
+        records = self._get_table_records_from_stream(obj, cell_getter)
+        sample = list(islice(records, self.sample_size))
+        columns = self._get_columns_from_records(sample)
+        rows = self._get_rows_from_stream(chain(sample, records), columns)
+        if self.late_columns == LateColumnsPolicy.Extra:
+            columns = [*columns, EXTRA_COLUMN_NAME]
+        return StreamingTableView(data=rows, columns=columns)
 
-    def _get_table_rows_from_dict(self, obj: dict, cell_getter: Optional[Callable] = None) -> Iterable[tuple]:
+    def _get_table_records_from_stream(self, obj: Iterable, cell_getter: Callable) -> Iterator[dict]:
+        # records of each batch are prefetched together, only one batch is kept in memory
+        for batch in get_batches(obj, self.sample_size):
+            yield from self._get_table_records_from_iter(batch, cell_getter)
+
+    def _get_rows_from_stream(self, records: Iterable[dict], columns: list) -> Iterator[tuple]:
+        known_columns = set(columns)
+        for rec in records:
+            row = [rec.get(c) for c in columns]
+            if self.late_columns != LateColumnsPolicy.Ignore:
+                late_fields = [f for f in rec if f not in known_columns]
+                if self.late_columns == LateColumnsPolicy.Extra:
+                    row.append(', '.join(f'{f}: {rec[f]}' for f in late_fields) or None)
+                elif late_fields:
+                    raise ValueError(f'fields {late_fields} are missing in first {self.sample_size} records')
+            yield tuple(row)
+
+    def _get_table_rows_from_dict(
+            self,
+            obj: dict,
+            cell_getter: Optional[Callable] = None,
+            fields: Optional[Iterable] = None,
+    ) -> Iterable[tuple]:
         if not cell_getter:
             cell_getter = self._get_one_line
-        for field, value in obj.items():
+        items = obj.items() if fields is None else ((f, obj[f]) for f in fields)
+        for field, value in items:
             hint = get_hint(value)
             value_repr = cell_getter(value)
             yield field, hint, value_repr  # matches DEFAULT_COLUMN_NAMES
@@ -74,3 +240,100 @@ class TableViewer(TextViewer):
         for rec in records:
             row = [rec.get(c) for c in columns]
             yield tuple(row)
+
+
+class TablePager:
+    """
+    Navigation over pages of rows of large collection (or iterator), shown by TableViewer.
+    Each page is built only from its own rows, so it is rendered in time proportional to page size:
+    sequences and array-like sources are sliced, iterators are skipped ahead from current position
+    (so pages of one-pass iterator can be shown only forward).
+    Total count of rows is not calculated until it is requested, and for iterators it is only estimated.
+    """
+
+    def __init__(self, viewer: TableViewer, obj, page_size: int = DEFAULT_PAGE_SIZE):
+        assert page_size > 0, ValueError(f'page_size must be positive, got {page_size}')
+        self.viewer = viewer
+        self.obj = obj
+        self.page_size = page_size
+        self.number = None  # current page, None until any page is shown
+        self._position = 0  # count of rows taken from iterator
+        self._page_rows = None  # rows of last page taken from iterator, can not be taken again
+        self._count = None  # known after iterator is exhausted
+
+    def get_current_number(self) -> int:
+        # number of shown page, or first page if no page is shown yet
+        return 0 if self.number is None else self.number
+
+    def get_offset(self, number: Optional[int] = None) -> int:
+        if number is None:
+            number = self.get_current_number()
+        return number * self.page_size
+
+    def get_page(self, number: Optional[int] = None) -> TableView:
+        if number is None:
+            number = self.get_current_number()
+        assert number >= 0, ValueError(f'page number must be non-negative, got {number}')
+        offset = self.get_offset(number)
+        if isinstance(self.obj, Iterator):
+            rows = self._get_rows_from_iterator(offset)
+            view = self.viewer.get_view(rows, offset=0, limit=self.page_size)
+        else:
+            view = self.viewer.get_view(self.obj, offset=offset, limit=self.page_size)
+        self.number = number
+        return view
+
+    def get_next(self) -> TableView:
+        # first page is shown if no page is shown yet
+        return self.get_page(0 if self.number is None else self.number + 1)
+
+    def get_previous(self) -> TableView:
+        return self.get_page(max(self.get_current_number() - 1, 0))
+
+    def _get_rows_from_iterator(self, offset: int) -> list:
+        if self._page_rows is not None and self._position - len(self._page_rows) == offset:
+            return self._page_rows  # same page again
+        if offset < self._position:
+            raise ValueError(f'iterator is already at row {self._position}, previous rows can not be shown')
+        skipped = deque(enumerate(islice(self.obj, offset - self._position), 1), maxlen=1)
+        if skipped:
+            self._position += skipped[0][0]
+        rows = list(islice(self.obj, self.page_size))
+        self._position += len(rows)
+        if self._position < offset + self.page_size:
+            self._count = self._position
+        self._page_rows = rows
+        return rows
+
+    def get_count(self) -> Optional[int]:
+        # exact count of rows if it is known without iterating rows
+        source = get_column_source(self.obj)
+        if source is not None:
+            return source.get_count()
+        elif isinstance(self.obj, Sized):
+            return len(self.obj)
+        else:
+            return self._count
+
+    def get_count_estimate(self) -> int:
+        count = self.get_count()
+        if count is None:  # rows taken from iterator and hint of remaining rows
+            count = self._position + length_hint(self.obj)
+        return count
+
+    def get_pages_count(self) -> Optional[int]:
+        count = self.get_count()
+        if count is not None:
+            return max(ceil(count / self.page_size), 1)
+
+    def get_title(self) -> str:
+        pages_count = self.get_pages_count()
+        number = self.get_current_number() + 1
+        title = f'page {number}'
+        if pages_count is not None:
+            title += f' of {pages_count}'
+        else:
+            estimate = ceil(self.get_count_estimate() / self.page_size)
+            if estimate > number:
+                title += f' of ~{estimate}'
+        return title
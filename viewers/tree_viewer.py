@@ -1,19 +1,87 @@
-from typing import Optional, Iterable
+from typing import Optional, Iterable, Union
 
 from util.types import COLLECTION_TYPES
+from util.const import JUPYTER_LINE_LEN
+from util.functions import get_head_and_tail
 from interfaces.wrapper_interface import WrapperInterface
 from visual import TagType
 from views.formatted_view import FormattedView
+from views.tape_view import TapeView
 from viewers.text_viewer import TextViewer
 from viewers.one_line_text_viewer import OneLineTextViewer
 
+MORE_ITEMS_TEMPLATE = '… {} more items'
+ONE_MORE_ITEM_TEXT = '… 1 more item'
+
+
+class NodeBudget:
+    """
+    Count of items which still can be shown in one view, shared by all levels of tree.
+    """
+    __slots__ = 'remaining',
+
+    def __init__(self, count: int):
+        self.remaining = count
+
+    def take(self, count: int) -> int:
+        taken = min(count, self.remaining)
+        self.remaining -= taken
+        return taken
+
 
 class TreeViewer(TextViewer):
     _get_one_line = OneLineTextViewer().get_view
 
-    def __init__(self, depth: Optional[int] = 5):
+    def __init__(
+            self,
+            depth: Optional[int] = 5,
+            normalize: bool = False,
+            max_items: Optional[int] = None,
+            max_nodes: Optional[int] = None,
+            tail_items: int = 0,
+            max_line_len: Optional[int] = None,
+    ):
+        """
+        :param depth: count of expanded levels of tree.
+        :param normalize: flatten view with get_normalized() before returning (opt-in: it costs about one render
+        and makes following renders only slightly faster, see bench_normalization()).
+        :param max_items: max count of shown items of each list (or dict) in tree, others are replaced by "… N more items".
+        :param max_nodes: max count of shown items in entire tree, upper levels are filled first.
+        :param tail_items: count of last items shown after "… N more items" (from max_items).
+        :param max_line_len: crop one-line descriptions of items (items of long collections are not iterated),
+        JUPYTER_LINE_LEN by default if max_items or max_nodes is set, so one-line headers are limited too.
+        """
         super().__init__()
         self.depth = depth
+        self.normalize = normalize
+        self.max_items = max_items
+        self.max_nodes = max_nodes
+        self.tail_items = tail_items
+        if max_line_len is None and (max_items is not None or max_nodes is not None):
+            max_line_len = JUPYTER_LINE_LEN
+        if max_line_len is not None:
+            self._get_one_line = OneLineTextViewer(max_len=max_line_len).get_view
+
+    def _get_budget(self) -> Optional[NodeBudget]:
+        if self.max_nodes is not None:
+            return NodeBudget(self.max_nodes)
+
+    def _get_shown_items(self, items: Union[Iterable, dict], budget: Optional[NodeBudget]) -> tuple:
+        # returns head items (or keys), count of skipped items, tail items, without iterating skipped items
+        count = len(items)
+        shown_count = count
+        if self.max_items is not None:
+            shown_count = min(shown_count, self.max_items)
+        if budget is not None:
+            shown_count = budget.take(shown_count)
+        if shown_count == count:
+            return items, 0, ()
+        tail_count = min(self.tail_items, shown_count)
+        return get_head_and_tail(items, shown_count - tail_count, tail_count)
+
+    @staticmethod
+    def _get_more_items_text(count: int) -> str:
+        return ONE_MORE_ITEM_TEXT if count == 1 else MORE_ITEMS_TEMPLATE.format(count)
 
     def get_view(
             self,
@@ -22,6 +90,21 @@ class TreeViewer(TextViewer):
             prefix: Optional[FormattedView] = None,
             tag: Optional[TagType] = None,
             ordered: Optional[bool] = False,
+    ) -> FormattedView:
+        budget = self._get_budget()
+        view = self._get_tree_view(obj, depth=depth, prefix=prefix, tag=tag, ordered=ordered, budget=budget)
+        if self.normalize:
+            view = view.get_normalized()
+        return view
+
+    def _get_tree_view(
+            self,
+            obj,
+            depth: Optional[int] = None,
+            prefix: Optional[FormattedView] = None,
+            tag: Optional[TagType] = None,
+            ordered: Optional[bool] = False,
+            budget: Optional[NodeBudget] = None,
     ) -> FormattedView:
         wrapped_obj = self._get_wrapped_object(obj)
         one_line = self._get_one_line(wrapped_obj)
@@ -31,11 +114,12 @@ class TreeViewer(TextViewer):
             depth = self.depth
         if depth > 0:
             if isinstance(obj, dict):
-                items = self._get_view_items_for_dict(obj, depth=depth-1)
+                items = self._get_view_items_for_dict(obj, depth=depth-1, budget=budget)
             elif isinstance(obj, COLLECTION_TYPES) and not isinstance(obj, str):
-                items = self._get_view_items_for_iter(obj, depth=depth-1, ordered=ordered)
+                items = self._get_view_items_for_iter(obj, depth=depth-1, ordered=ordered, budget=budget)
             else:
-                items = self._get_view_items_for_dict(wrapped_obj.get_props(), depth=depth-1)
+                props = wrapped_obj.get_props(lazy=True)
+                items = self._get_view_items_for_dict(props, depth=depth-1, budget=budget, wrapped_obj=wrapped_obj)
             if ordered is None:
                 ordered = not isinstance(obj, (set, dict, WrapperInterface))
             formatted_list = FormattedView(items, TagType.List.create(ordered=ordered))
@@ -43,24 +127,130 @@ class TreeViewer(TextViewer):
                 return FormattedView([one_line, formatted_list], tag=tag)
         return FormattedView([one_line], tag=tag)
 
-    def _get_view_items_for_dict(self, obj: dict, depth: int) -> Iterable[FormattedView]:
+    def _get_view_items_for_dict(
+            self,
+            obj: dict,
+            depth: int,
+            budget: Optional[NodeBudget] = None,
+            wrapped_obj: Optional[WrapperInterface] = None,
+    ) -> Iterable[FormattedView]:
+        # props of wrapped_obj are prefetched only for shown keys
         font_tag_builder = TagType.Font.get_builder()
         key_font = font_tag_builder(color="gray")
         delimiter_font = font_tag_builder(color="silver")
-        for k, v in obj.items():
-            formatted_key = FormattedView(k, tag=key_font)
-            formatted_delimiter = FormattedView(': ', tag=delimiter_font)
-            formatted_view = self.get_view(
-                v,
-                depth=depth-1,
-                prefix=formatted_key + formatted_delimiter,
-                tag=TagType.ListItem.create(ordered=False),
-            )
-            yield formatted_view
-
-    def _get_view_items_for_iter(self, obj: Iterable, depth: int, ordered: Optional[bool]) -> Iterable[FormattedView]:
+        keys, skipped_count, tail_keys = self._get_shown_items(obj, budget)
+        if wrapped_obj is not None:
+            keys = list(keys)
+            wrapped_obj.prefetch_props(obj, keys=[*keys, *tail_keys])
+        for k in keys:
+            yield self._get_view_item_for_dict(k, obj[k], depth, key_font, delimiter_font, budget)
+        if skipped_count:
+            more_items = self._get_more_items_text(skipped_count)
+            yield FormattedView([more_items], tag=TagType.ListItem.create(ordered=False))
+        for k in tail_keys:
+            yield self._get_view_item_for_dict(k, obj[k], depth, key_font, delimiter_font, budget)
+
+    def _get_view_item_for_dict(self, key, value, depth: int, key_font, delimiter_font, budget) -> FormattedView:
+        formatted_key = FormattedView(key, tag=key_font)
+        formatted_delimiter = FormattedView(': ', tag=delimiter_font)
+        return self._get_tree_view(
+            value,
+            depth=depth-1,
+            prefix=formatted_key + formatted_delimiter,
+            tag=TagType.ListItem.create(ordered=False),
+            budget=budget,
+        )
+
+    def _get_view_items_for_iter(
+            self,
+            obj: Iterable,
+            depth: int,
+            ordered: Optional[bool],
+            budget: Optional[NodeBudget] = None,
+    ) -> Iterable[FormattedView]:
         if ordered is None:
             ordered = not isinstance(obj, set)
         item_tag = TagType.ListItem.create(ordered=ordered)
-        for i in obj:
-            yield self.get_view(i, depth=depth, ordered=ordered, tag=item_tag)
+        items, skipped_count, tail_items = self._get_shown_items(obj, budget)
+        for i in items:
+            yield self._get_tree_view(i, depth=depth, ordered=ordered, tag=item_tag, budget=budget)
+        if skipped_count:
+            yield FormattedView([self._get_more_items_text(skipped_count)], tag=item_tag)
+        for i in tail_items:
+            yield self._get_tree_view(i, depth=depth, ordered=ordered, tag=item_tag, budget=budget)
+
+    def get_tape(self, obj, depth: Optional[int] = None) -> TapeView:
+        """
+        Writes the same tree as get_view() directly into flat TapeView, without building tree of FormattedView.
+        """
+        tape = TapeView()
+        tags = dict(
+            key_font=TagType.Font.create(color="gray"),
+            delimiter_font=TagType.Font.create(color="silver"),
+            item=TagType.ListItem.create(ordered=False),
+            ordered_item=TagType.ListItem.create(ordered=True),
+            list=TagType.List.create(ordered=False),
+            ordered_list=TagType.List.create(ordered=True),
+        )
+        self._add_to_tape(tape, tags, obj, depth=depth, budget=self._get_budget())
+        return tape
+
+    def _add_to_tape(
+            self,
+            tape: TapeView,
+            tags: dict,
+            obj,
+            depth: Optional[int] = None,
+            prefix: Optional[FormattedView] = None,
+            tag: Optional[TagType] = None,
+            ordered: Optional[bool] = False,
+            budget: Optional[NodeBudget] = None,
+    ):
+        # mirrors get_view()
+        wrapped_obj = self._get_wrapped_object(obj)
+        one_line = self._get_one_line(wrapped_obj)
+        tape.open(tag)
+        if prefix:
+            tape.open()
+            tape.add(prefix)
+            tape.add(one_line)
+            tape.close()
+        else:
+            tape.add(one_line)
+        if depth is None:
+            depth = self.depth
+        if depth > 0:
+            depth -= 1
+            is_props = False
+            if isinstance(obj, dict):
+                items, is_dict = obj, True
+            elif isinstance(obj, COLLECTION_TYPES) and not isinstance(obj, str):
+                items, is_dict = obj, False
+            else:
+                items, is_dict = wrapped_obj.get_props(lazy=True), True
+                is_props = True
+            item_ordered = not isinstance(obj, set) if ordered is None else ordered
+            if ordered is None:
+                ordered = not isinstance(obj, (set, dict, WrapperInterface))
+            tape.open(tags['ordered_list' if ordered else 'list'])
+            item_tag = tags['item' if is_dict or not item_ordered else 'ordered_item']
+            head, skipped_count, tail = self._get_shown_items(items, budget)
+            if is_props:  # only shown props are prefetched
+                head = list(head)
+                wrapped_obj.prefetch_props(items, keys=[*head, *tail])
+            for shown_items in (head, tail):
+                if shown_items is tail and skipped_count:
+                    self._add_more_items_to_tape(tape, skipped_count, item_tag)
+                for i in shown_items:
+                    if is_dict:
+                        prefix = FormattedView(i, tag=tags['key_font']) + FormattedView(': ', tag=tags['delimiter_font'])
+                        self._add_to_tape(tape, tags, items[i], depth=depth-1, prefix=prefix, tag=item_tag, budget=budget)
+                    else:
+                        self._add_to_tape(tape, tags, i, depth=depth, tag=item_tag, ordered=item_ordered, budget=budget)
+            tape.close(drop_empty=True)
+        tape.close()
+
+    def _add_more_items_to_tape(self, tape: TapeView, count: int, tag):
+        tape.open(tag)
+        tape.add(self._get_more_items_text(count))
+        tape.close()
@@ -1,4 +1,7 @@
-from util.functions import get_repr
+from typing import Iterator, TextIO
+
+from util.const import WRITE_BUFFER_SIZE
+from util.functions import get_repr, write_chunks
 from abstract.common_abstract import CommonAbstract
 
 
@@ -19,6 +22,27 @@ class AbstractView(CommonAbstract):
         obj_repr = get_repr(self.get_data())
         return f'({obj_repr})'
 
+    def render(self, fp: TextIO, format: str = 'text', buffer_size: int = WRITE_BUFFER_SIZE) -> int:
+        """
+        Writes view in specified format directly into text stream (file, HTTP response, ...) with buffering,
+        without building the full document in memory.
+        :param format: one of get_formats(), i.e. 'text', 'md', 'html' for FormattedView, 'json', 'yaml' for SerialView.
+        :return: count of written chars.
+        """
+        return write_chunks(fp, self.get_chunks(format), buffer_size=buffer_size)
+
+    def get_chunks(self, format: str = 'text') -> Iterator[str]:
+        method = getattr(self, f'get_{format}_chunks', None)
+        if method is None:
+            formats = ', '.join(self.get_formats())
+            raise ValueError(f'{self.__class__.__name__} can not render {format} (available: {formats})')
+        return method()
+
+    def get_formats(self) -> list:
+        prefix, suffix = 'get_', '_chunks'
+        names = [n for n in dir(self) if n.startswith(prefix) and n.endswith(suffix) and n != 'get_chunks']
+        return [n[len(prefix):-len(suffix)] for n in names]
+
     def __str__(self):
         return str(self.get_data())
 
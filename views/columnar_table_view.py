@@ -0,0 +1,284 @@
+from typing import Optional, Iterable, Iterator, Union
+from array import array
+from functools import partial
+from bisect import bisect_left
+from copy import copy
+
+from util.ext import np
+from util.types import Array
+from util.functions import percentage, get_joined_blocks
+from views.formatted_view import FormattedView
+from views.table_view import TableView
+
+NONE_TEXT = '-'
+HTML_CELL_TEMPLATE = '<td style="text-align: left;">{}</td>'
+ARRAY_TYPECODES = {int: 'q', float: 'd'}
+
+
+class ColumnFormat:
+    """
+    Formatting of numeric column, applied to whole column at once (other values are shown as str()).
+    """
+    __slots__ = 'precision', 'percent', 'round_digits', 'smart', 'delimiter'
+
+    def __init__(
+            self,
+            precision: Optional[int] = None,
+            percent: bool = False,
+            round_digits: Optional[int] = None,
+            smart: bool = False,
+            delimiter: str = '',
+    ):
+        """
+        :param precision: fixed count of digits after point, i.e. 2 for '1.50' (or '150.00%' for percent).
+        :param percent: show values as percents, same as percentage() with round_digits, smart and delimiter.
+        """
+        self.precision = precision
+        self.percent = percent
+        self.round_digits = round_digits
+        self.smart = smart
+        self.delimiter = delimiter
+
+    def get_template(self) -> Optional[str]:
+        # printf-style template for fixed precision (used for NumPy arrays)
+        if self.precision is not None:
+            suffix = f'{self.delimiter}%%' if self.percent else ''
+            return f'%.{self.precision}f{suffix}'
+
+    def get_formatter(self):
+        if self.precision is not None:
+            template = self.get_template()
+            if self.percent:
+                return lambda v: template % (v * 100)
+            return template.__mod__
+        elif self.percent:
+            return partial(percentage, round_digits=self.round_digits, smart=self.smart, delimiter=self.delimiter)
+        else:
+            return str
+
+    def get_strings(self, values: Iterable) -> list:
+        if np is not None and isinstance(values, np.ndarray):
+            if self.precision is not None:
+                if self.percent:
+                    values = values * 100
+                return np.char.mod(self.get_template(), values).tolist()
+            values = values.tolist()
+        return list(map(self.get_formatter(), values))
+
+
+class TableColumn:
+    """
+    Values of one column of ColumnarTableView:
+    int or float columns are stored in typed array (numpy.ndarray if NumPy installed, array.array otherwise),
+    None values are stored as zeros and masked by list of their indexes, other columns are kept as lists.
+    """
+    __slots__ = 'values', 'none_indexes', 'value_type'
+
+    def __init__(self, values: Iterable):
+        if np is not None and isinstance(values, np.ndarray) and values.ndim == 1 and values.dtype.kind in 'if':
+            # numeric NumPy column (i.e. field of structured array) is used as is, without copying
+            self.values = values
+            self.none_indexes = list()
+            self.value_type = int if values.dtype.kind == 'i' else float
+        else:
+            self._set_values(values)
+
+    def _set_values(self, values: Iterable):
+        values = values.tolist() if hasattr(values, 'tolist') else list(values)  # also memoryview, Series
+        self.none_indexes = [n for n, v in enumerate(values) if v is None]
+        types = {type(v) for v in values}
+        types.discard(type(None))
+        self.value_type = types.pop() if len(types) == 1 else None
+        if self.value_type in ARRAY_TYPECODES:
+            if self.none_indexes:
+                values = [0 if v is None else v for v in values]
+            try:
+                if np is not None:
+                    values = np.array(values, dtype=np.int64 if self.value_type is int else np.float64)
+                else:
+                    values = array(ARRAY_TYPECODES[self.value_type], values)
+            except OverflowError:  # too long int
+                values = self.get_values(values)
+                self.value_type = None
+        self.values = values
+
+    def get_window(self, start: int, stop: int):
+        # column of rows from start to stop, typed array is sliced without formatting of other values
+        column = copy(self)
+        column.values = self.values[start:stop]
+        first, last = bisect_left(self.none_indexes, start), bisect_left(self.none_indexes, stop)
+        column.none_indexes = [n - start for n in self.none_indexes[first:last]]
+        return column
+
+    def is_typed(self) -> bool:
+        return self.value_type in ARRAY_TYPECODES
+
+    def get_count(self) -> int:
+        return len(self.values)
+
+    def get_values(self, values: Optional[Iterable] = None) -> list:
+        # original values with None
+        if values is None:
+            values = self.values
+        values = values.tolist() if hasattr(values, 'tolist') else list(values)
+        for n in self.none_indexes:
+            values[n] = None
+        return values
+
+    def get_strings(self, column_format: Optional[ColumnFormat] = None, none_text: str = NONE_TEXT) -> list:
+        if not self.is_typed():
+            if column_format is None:
+                strings = list(map(str, self.values))
+            else:  # mixed column, only numbers are formatted
+                formatter = column_format.get_formatter()
+                strings = [formatter(v) if type(v) in ARRAY_TYPECODES else str(v) for v in self.values]
+        elif column_format is not None:
+            strings = column_format.get_strings(self.values)
+        elif self.value_type is int and np is not None:
+            strings = self.values.astype(str).tolist()
+        else:
+            values = self.values.tolist() if np is not None else self.values
+            strings = list(map(str, values))
+        for n in self.none_indexes:
+            strings[n] = none_text
+        return strings
+
+    def get_html_strings(self, column_format: Optional[ColumnFormat] = None) -> list:
+        if self.is_typed() or column_format is not None:
+            # None is shown as 'None' (as in TableView) if column is not formatted
+            return self.get_strings(column_format, none_text=NONE_TEXT if column_format else str(None))
+        strings = list()
+        for cell in self.values:
+            if isinstance(cell, FormattedView) or hasattr(cell, '_repr_html_'):
+                strings.append(cell._repr_html_())
+            else:
+                strings.append(str(cell))
+        return strings
+
+
+class ColumnarTableView(TableView):
+    """
+    TableView storing data by columns (see TableColumn) instead of rows,
+    cells are formatted column by column and rows are only joined while rendering.
+    Output is the same as of TableView over the same rows, numeric columns can be formatted by ColumnFormat.
+    """
+
+    def __init__(
+            self,
+            data: Union[Iterable[Array], dict],
+            columns: Optional[list] = None,
+            formats: Optional[dict] = None,
+    ):
+        """
+        :param data: rows (as TableView) or dict of column names and values.
+        :param formats: ColumnFormat by column name (or number).
+        """
+        if isinstance(data, dict) and columns is None:
+            columns = list(data)
+        self._columns = list()
+        self._count = 0
+        super().__init__(data=data, columns=columns)
+        self.formats = formats or dict()
+
+    def set_data(self, data: Union[Iterable[Array], dict]):
+        if isinstance(data, dict):
+            columns_values = data.values()
+        else:
+            rows = list(data)
+            widths = set(map(len, rows))
+            assert len(widths) <= 1, ValueError(f'rows of ColumnarTableView must have equal length, got {widths}')
+            columns_values = zip(*rows)
+        self._columns = [TableColumn(values) for values in columns_values]
+        self._count = self._columns[0].get_count() if self._columns else 0
+
+    def get_data(self) -> list:
+        # rows are restored only for compatibility with TableView, rendering does not use them
+        return list(zip(*[c.get_values() for c in self._columns]))
+
+    def get_table_columns(self) -> list:
+        return self._columns
+
+    def get_count(self) -> int:
+        return self._count
+
+    def get_window(self, offset: int = 0, limit: Optional[int] = None) -> TableView:
+        start = min(offset, self._count)
+        stop = self._count if limit is None else min(offset + limit, self._count)
+        view = copy(self)
+        view._columns = [c.get_window(start, stop) for c in self._columns]
+        view._count = stop - start
+        return view
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def get_column_format(self, number: int) -> Optional[ColumnFormat]:
+        if self.has_struct() and self.columns[number] in self.formats:
+            return self.formats[self.columns[number]]
+        return self.formats.get(number)
+
+    def _get_columns_strings(self) -> list:
+        return [c.get_strings(self.get_column_format(n)) for n, c in enumerate(self._columns)]
+
+    @staticmethod
+    def _get_joined_rows(columns_strings: list, prefix: str, delimiter: str, suffix: str) -> Iterator[str]:
+        # each row is joined by one call of str.join(), without formatting of separate cells
+        for line in map(delimiter.join, zip(*columns_strings)):
+            yield prefix + line + suffix
+
+    def _get_text_lines(self, including_title: bool = True) -> Iterator[str]:
+        if including_title and self.has_struct():
+            yield '\t'.join(self.get_column_names())
+        yield from map('\t'.join, zip(*self._get_columns_strings()))
+
+    def get_text_chunks(self) -> Iterator[str]:
+        return get_joined_blocks(self._get_text_lines(including_title=True))
+
+    def get_md_lines(self) -> Iterator[str]:
+        if self.has_struct():
+            yield from self.get_header().get_md_lines()
+            line = ' | '.join(['---' for _ in self.get_column_names()])
+            yield f'| {line} |'
+        yield from self._get_joined_rows(self._get_columns_strings(), '| ', ' | ', ' |')
+
+    def get_md_chunks(self) -> Iterator[str]:
+        return get_joined_blocks(self.get_md_lines())
+
+    def get_html_lines(self) -> Iterator[str]:
+        return self._get_html_lines(self.get_html_rows())
+
+    def get_html_chunks(self) -> Iterator[str]:
+        # each row is one multi-line block here, so joined html is the same as of get_html_lines()
+        return get_joined_blocks(self._get_html_lines(self._get_html_row_blocks()))
+
+    def _repr_html_(self):
+        return ''.join(self.get_html_chunks())
+
+    def _get_html_lines(self, rows: Iterable[str]) -> Iterator[str]:
+        yield '<table>'
+        if self.has_struct():
+            yield '<thead>'
+            yield from self.get_header().get_html_rows()
+            yield '</thead>'
+        yield '<tbody>'
+        yield from rows
+        yield '</tbody>'
+        yield '</table>'
+
+    def _get_html_columns_strings(self) -> list:
+        return [c.get_html_strings(self.get_column_format(n)) for n, c in enumerate(self._columns)]
+
+    def get_html_rows(self) -> Iterator[str]:
+        columns_cells = [list(map(HTML_CELL_TEMPLATE.format, s)) for s in self._get_html_columns_strings()]
+        for row in zip(*columns_cells):
+            yield '<tr>'
+            yield from row
+            yield '</tr>'
+
+    def _get_html_row_blocks(self) -> Iterator[str]:
+        open_cell, close_cell = HTML_CELL_TEMPLATE.split('{}')
+        prefix, delimiter, suffix = f'<tr>\n{open_cell}', f'{close_cell}\n{open_cell}', f'{close_cell}\n</tr>'
+        return self._get_joined_rows(self._get_html_columns_strings(), prefix, delimiter, suffix)
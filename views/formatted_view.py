@@ -1,9 +1,11 @@
-from typing import Optional, Iterable, Union
+from typing import Optional, Iterable, Iterator, AsyncIterator, Union
+from copy import copy
 
 from util.ext import HTML, display
-from util.const import INDENT
+from util.const import INDENT, WRITE_BUFFER_SIZE
 from util.types import PRIMITIVES
-from util.functions import remove_redundant_spacing
+from util.functions import remove_redundant_spacing, get_joined_chunks, get_buffered_chunks, get_split_lines
+from util.aio import aiter_in_thread
 from visual import TagType, AbstractFormattingTag
 from views.text_view import TextView
 
@@ -11,6 +13,8 @@ Native = TextView
 Text = Union[TextView, str]
 Tag = Union[AbstractFormattingTag, TagType, None]
 
+PLAIN_METHODS = 'get_data', 'get_count', 'get_html_lines', '_get_html_parts', '_get_formatted_tags', '_get_md_parts', '_get_text_parts'
+
 
 class FormattedView(TextView):
     """
@@ -31,8 +35,7 @@ class FormattedView(TextView):
             return self.tag.get_tag_type()
 
     def get_md_lines(self) -> Iterable[str]:
-        one_line = ''.join(self._get_md_parts())
-        yield from one_line.split('\n')
+        yield from get_split_lines(self._get_md_parts())
 
     def get_html_lines(self) -> Iterable[str]:
         if self.tag:
@@ -58,48 +61,67 @@ class FormattedView(TextView):
         yield from one_line.split('\n')
 
     def _get_text_parts(self) -> Iterable[str]:
-        if self.tag:
-            yield self.tag.get_text_open_tag()
-        for i in self.get_data():
-            if i is None:
-                pass
-            elif isinstance(i, str):
-                yield i
-            elif isinstance(i, PRIMITIVES):
-                yield str(i)
-            elif isinstance(i, FormattedView) or hasattr(i, '_get_text_parts'):
-                if i.get_tag_type() == TagType.List:
-                    for j in i._get_text_parts():
-                        yield j.replace('\n', '\n' + INDENT)
+        return self._get_formatted_parts(md=False)
+
+    def _get_md_parts(self) -> Iterable[str]:
+        return self._get_formatted_parts(md=True)
+
+    def _get_formatted_parts(self, md: bool) -> Iterator[str]:
+        """
+        Walks nested views with explicit stack and generates parts of markdown (or text),
+        nested lists are indented by accumulated indent, so each part is processed once regardless of depth.
+        """
+        method_name = '_get_md_parts' if md else '_get_text_parts'
+        own_method = getattr(FormattedView, method_name)
+        open_tag, close_tag = self._get_formatted_tags(md)
+        if open_tag:
+            yield open_tag
+        stack = [(iter(self.get_data()), '', close_tag)]  # items, indent, close tag
+        while stack:
+            items, indent, close_tag = stack[-1]
+            for i in items:
+                if i is None:
+                    pass
+                elif isinstance(i, str):
+                    yield self._get_indented(i, indent)
+                elif isinstance(i, PRIMITIVES) and not md:
+                    yield str(i)
+                elif isinstance(i, FormattedView) or hasattr(i, method_name):
+                    i_indent = indent + INDENT if i.get_tag_type() == TagType.List else indent
+                    if getattr(type(i), method_name, None) is own_method:
+                        i_open_tag, i_close_tag = i._get_formatted_tags(md)
+                        if i_open_tag:
+                            yield self._get_indented(i_open_tag, i_indent)
+                        stack.append((iter(i.get_data()), i_indent, i_close_tag))
+                        break
+                    else:  # customized
+                        for j in getattr(i, method_name)():
+                            yield self._get_indented(j, i_indent)
+                elif isinstance(i, TextView):
+                    for line in i.get_text_lines():
+                        yield self._get_indented(line, indent)
+                elif md:
+                    yield self._get_indented(str(i), indent)
                 else:
-                    yield from i._get_text_parts()
-            elif isinstance(i, TextView):
-                yield from i.get_text_lines()
-            else:
-                raise TypeError(i)
-        if self.tag:
-            yield self.tag.get_text_close_tag()
+                    raise TypeError(i)
+            else:  # items are over
+                stack.pop()
+                if close_tag:
+                    yield self._get_indented(close_tag, indent)
 
-    def _get_md_parts(self):
+    def _get_formatted_tags(self, md: bool) -> tuple:
         if self.tag:
-            yield self.tag.get_md_open_tag()
-        for i in self.get_data():
-            if i is None:
-                pass
-            elif isinstance(i, str):
-                yield i
-            elif isinstance(i, FormattedView) or hasattr(i, '_get_md_parts'):
-                if i.get_tag_type() == TagType.List:
-                    for j in i._get_md_parts():
-                        yield j.replace('\n', '\n' + INDENT)
-                else:
-                    yield from i._get_md_parts()
-            elif isinstance(i, TextView):
-                yield from i.get_text_lines()
+            if md:
+                return self.tag.get_md_open_tag(), self.tag.get_md_close_tag()
             else:
-                yield str(i)
-        if self.tag:
-            yield self.tag.get_md_close_tag()
+                return self.tag.get_text_open_tag(), self.tag.get_text_close_tag()
+        return None, None
+
+    @staticmethod
+    def _get_indented(part: str, indent: str) -> str:
+        if indent and '\n' in part:
+            return part.replace('\n', '\n' + indent)
+        return part
 
     def _get_html_parts(self):
         for i in self.get_data():
@@ -117,6 +139,95 @@ class FormattedView(TextView):
             else:
                 raise TypeError(repr(i))
 
+    @staticmethod
+    def is_plain(view) -> bool:
+        # FormattedView without customized rendering of items (tags can be customized, as in SquareView)
+        view_class = type(view)
+        if view_class is FormattedView:
+            return True
+        elif not isinstance(view, FormattedView):
+            return False
+        return all(getattr(view_class, m) is getattr(FormattedView, m) for m in PLAIN_METHODS)
+
+    def get_normalized(self) -> Native:
+        """
+        Returns equivalent tree of views (with the same text, markdown and html) with less nodes:
+        untagged nested views are flattened into parent, adjacent strings are merged, None and empty strings are dropped.
+        Html of view with less than 2 items is written in one line,
+        so each change is applied only where it keeps the same html.
+        Nested views are copied, original tree is not modified.
+        Normalization takes about as long as one render, and renders of normalized view are only 0-15% faster,
+        so it does not pay off for few renders of view, but normalized view keeps less nodes in memory.
+        """
+        stack = [(self, iter(self.get_data()), list(), False)]  # view, items, normalized items, is joined into line
+        while True:
+            view, items, normalized_items, is_joined = stack[-1]
+            for i in items:
+                if self.is_plain(i):
+                    is_child_joined = view.get_count() < 2 or (is_joined and not view.tag)
+                    stack.append((i, iter(i.get_data()), list(), is_child_joined))
+                    break
+                else:
+                    normalized_items.append(i)
+            else:  # items are over
+                stack.pop()
+                normalized = view._get_normalized_copy(normalized_items, is_joined)
+                if not stack:
+                    return normalized
+                parent, _, parent_items, is_parent_joined = stack[-1]
+                if parent._can_flatten(normalized, is_parent_joined):
+                    parent_items.extend(normalized.get_data())
+                else:
+                    parent_items.append(normalized)
+
+    def _get_normalized_copy(self, items: list, is_joined: bool) -> Native:
+        if is_joined and not self.tag:  # html lines of this view are joined without indent
+            items = self._get_merged_strings(i for i in items if i is not None and i != '')
+        elif self.get_count() < 2:  # html is one line anyway
+            items = [i for i in items if i is not None and i != '']
+        elif sum(i is not None for i in items) >= 2:  # html is still multi-line
+            items = [i for i in items if i is not None]
+        view = object.__new__(type(self))  # shallow copy, faster than copy() for many small views
+        view.__dict__.update(self.__dict__)
+        if self.tag:
+            view.tag = copy(self.tag)
+        view.set_data(items)
+        return view
+
+    @staticmethod
+    def _get_merged_strings(items: Iterable) -> list:
+        merged = list()
+        for i in items:
+            if isinstance(i, str) and merged and isinstance(merged[-1], str):
+                merged[-1] += i
+            else:
+                merged.append(i)
+        return merged
+
+    def _can_flatten(self, child: Native, is_joined: bool) -> bool:
+        # checks that items of untagged child can replace it in this view without changing html
+        if child.tag:
+            return False
+        count, child_count = self.get_count(), child.get_count()
+        if is_joined and not self.tag:
+            return True
+        elif count < 2:
+            return child_count < 2
+        elif child_count == 1:
+            return self._is_one_html_line(child.get_data()[0])
+        else:
+            return child_count >= 2
+
+    def _is_one_html_line(self, item) -> bool:
+        if isinstance(item, PRIMITIVES):
+            return True
+        elif self.is_plain(item):
+            return item.get_count() < 2
+        elif type(item) is TextView:
+            return len(item.get_data()) == 1
+        else:
+            return False
+
     def get_html_open_tag(self) -> str:
         return self.tag.get_html_open_tag()
 
@@ -138,3 +249,18 @@ class FormattedView(TextView):
 
     def _repr_markdown_(self):
         return '\n'.join(self.get_md_lines())
+
+    def get_html_chunks(self) -> Iterator[str]:
+        return get_joined_chunks(self.get_html_lines())
+
+    def get_md_chunks(self) -> Iterator[str]:
+        return get_joined_chunks(self.get_md_lines())
+
+    def aiter_html(self, buffer_size: int = WRITE_BUFFER_SIZE) -> AsyncIterator[str]:
+        """
+        Async iterator over parts of _repr_html_(), rendered in thread, yields control to event loop between parts.
+        """
+        return aiter_in_thread(lambda: get_buffered_chunks(self.get_html_chunks(), buffer_size))
+
+    def aiter_md(self, buffer_size: int = WRITE_BUFFER_SIZE) -> AsyncIterator[str]:
+        return aiter_in_thread(lambda: get_buffered_chunks(self.get_md_chunks(), buffer_size))
@@ -1,47 +1,440 @@
-from typing import Optional
+from typing import Optional, Iterator, AsyncIterator, Iterable, Callable, TextIO, Union
+from os import PathLike
 import json
 import yaml
+from yaml.events import (
+    DocumentStartEvent, DocumentEndEvent, AliasEvent, ScalarEvent,
+    SequenceStartEvent, SequenceEndEvent, MappingStartEvent, MappingEndEvent,
+)
+from yaml.nodes import ScalarNode, SequenceNode, MappingNode
 
 from views.abstract_view import AbstractView
 from wrappers.common_wrapper import CommonWrapper
 from util.types import Class
+from util.type_handlers import MISSING
+from util.const import WRITE_BUFFER_SIZE
+from util.functions import write_chunks, get_batches, get_buffered_chunks
+from util.aio import aiter_in_thread
+from util.serial_backends import IndentDumper, get_serial_backend
 
+JSON_REF_KEY = '$ref'
+JSON_ENCODER = json.JSONEncoder(ensure_ascii=False)  # same settings as in get_json()
 
-class IndentDumper(yaml.SafeDumper):
-    # increase indent according Ansible style: https://habr.com/ru/articles/669684/
-    def increase_indent(self, flow=False, indentless=False):
-        return super(IndentDumper, self).increase_indent(flow, indentless=False)
+
+START, VALUE, REF, END = 'start', 'value', 'ref', 'end'  # events of SerialView._get_serial_events()
+
+
+class SerialRef:
+    """
+    Marks (in refs) an object already met during serialization,
+    stores label (json pointer or yaml anchor) for references to it.
+    """
+
+    def __init__(self):
+        self.label = None
+
+
+class ChunkStream:
+    # text stream collecting written parts, so writer (i.e. yaml emitter) can be used as generator
+    def __init__(self):
+        self.chunks = list()
+
+    def write(self, text: str):
+        self.chunks.append(text)
+
+    def flush(self):
+        pass
+
+    def pop_chunks(self) -> list:
+        chunks, self.chunks = self.chunks, list()
+        return chunks
 
 
 class SerialView(AbstractView):
-    def __init__(self, data, depth: Optional[int] = None, use_tech_names: bool = False, skip_empty: bool = False):
+    def __init__(
+            self,
+            data,
+            depth: Optional[int] = None,
+            use_tech_names: bool = False,
+            skip_empty: bool = False,
+            use_refs: bool = False,
+    ):
         super().__init__(data)
         self.depth = depth
         self.use_tech_names = use_tech_names
         self.skip_empty = skip_empty
+        self.use_refs = use_refs  # serialize repeated objects once, use $ref (json) or aliases (yaml) for repeats
 
-    def get_serializable_props(self, ordered: bool = True):
+    def get_wrapped_data(self) -> CommonWrapper:
         data = self.get_data()
         if not isinstance(data, CommonWrapper):
             data = CommonWrapper.wrap(data)
+        return data
+
+    def get_serializable_props(self, ordered: bool = True):
+        data = self.get_wrapped_data()
         return data.get_serializable_props(
             self.depth,
             use_tech_names=self.use_tech_names,
             skip_empty=self.skip_empty,
             ordered=ordered,
+            refs=dict() if self.use_refs else None,
         )
 
-    def get_json(self) -> str:
+    def get_json(self, fast: bool = False) -> str:
+        """
+        :param fast: use fastest available json-codec (i.e. orjson), its output is more compact.
+        """
         data = self.get_serializable_props(ordered=True)
-        return json.dumps(data, ensure_ascii=False)
+        if self.use_refs:
+            data = self._get_with_json_refs(data)
+        return get_serial_backend('json', exact=not fast).dumps(data)
+
+    def write_json(self, fp: TextIO) -> int:
+        """
+        Writes the same text as get_json() returns into stream, without building full serializable structure.
+        :return: count of written chars.
+        """
+        return write_chunks(fp, self.get_json_chunks())
+
+    def get_json_chunks(self) -> Iterator[str]:
+        """
+        Lazily generates parts of the same text as get_json() returns.
+        Walks wrapped data with explicit stack, only currently opened containers are kept in memory.
+        """
+        encode = JSON_ENCODER.encode
+        refs = dict() if self.use_refs else None
+        pointers, counts, is_lists = list(), list(), list()  # for opened containers
+        for event, key, value in self._get_serial_events(ordered=True, refs=refs):
+            if event == END:
+                pointers.pop(), counts.pop(), is_lists.pop()
+                yield ']' if value else '}'
+                continue
+            if counts:  # not root
+                prefix = ', ' if counts[-1] else ''
+                counts[-1] += 1
+                if not is_lists[-1]:
+                    prefix += encode(self._get_json_key(key)) + ': '
+            else:
+                prefix = ''
+            if event == START:
+                is_list, ref = value
+                pointer = self._get_json_pointer(pointers[-1], key) if pointers else '#'
+                if ref:
+                    ref.label = pointer
+                pointers.append(pointer), counts.append(0), is_lists.append(is_list)
+                yield prefix + ('[' if is_list else '{')
+            elif event == REF:
+                yield prefix + encode({JSON_REF_KEY: value.label})
+            else:  # event == VALUE
+                yield prefix + encode(value)
+
+    def aiter_json(self, buffer_size: int = WRITE_BUFFER_SIZE) -> AsyncIterator[str]:
+        """
+        Async iterator over parts of get_json() text, walking data in thread,
+        yields control to event loop between parts, awaits awaitable property values.
+        """
+        return aiter_in_thread(lambda: get_buffered_chunks(self.get_json_chunks(), buffer_size))
+
+    def _get_serial_events(self, ordered: bool = True, refs: Optional[dict] = None) -> Iterator[tuple]:
+        """
+        Walks wrapped data the same way as get_serializable_props() does, but with explicit stack,
+        and generates flat events instead of building containers:
+        (START, key, (is_list, SerialRef or None)), (VALUE, key, value), (REF, key, SerialRef), (END, key, is_list).
+        """
+        use_tech_names, skip_empty = self.use_tech_names, self.skip_empty
+        wrapped = self.get_wrapped_data()
+        value, obj = wrapped._get_serializable_leaf_or_items(self.depth, skip_empty=skip_empty, refs=refs)
+        if obj is MISSING:
+            yield REF if isinstance(value, SerialRef) else VALUE, None, value
+            return
+        frame = self._get_serial_frame(wrapped, obj, self.depth, key=None, refs=refs)
+        yield START, None, (frame[2], frame[5])
+        stack = [frame]
+        ancestors = {id(wrapped.get_raw_object())}  # unlimited depth only
+        while stack:
+            wrapper, items, is_list, depth, key, _ = stack[-1]
+            v_depth = depth - 1 if depth is not None else None
+            child = None
+            for k, v in items:
+                v_value, v = wrapper._get_serializable_item(k, v, use_tech_names=use_tech_names)
+                if v_value is MISSING:
+                    if type(v).get_serializable_props is not CommonWrapper.get_serializable_props:  # customized
+                        v_value = v.get_serializable_props(v_depth, use_tech_names, skip_empty, ordered, refs)
+                    else:
+                        v_value, v_obj = v._get_serializable_leaf_or_items(v_depth, skip_empty, refs)
+                        if v_obj is not MISSING:
+                            if v_depth is None:
+                                v._check_not_circular(v.get_raw_object(), ancestors)
+                            child = self._get_serial_frame(v, v_obj, v_depth, key=k, refs=refs)
+                            yield START, k, (child[2], child[5])
+                            break
+                yield REF if isinstance(v_value, SerialRef) else VALUE, k, v_value
+            if child:
+                stack.append(child)
+            else:
+                stack.pop()
+                ancestors.discard(id(wrapper.get_raw_object()))
+                yield END, key, is_list
+
+    @staticmethod
+    def _get_serial_frame(wrapper: CommonWrapper, obj, depth: Optional[int], key, refs: Optional[dict]) -> list:
+        # frame of _get_serial_events(): wrapper, items iterator, is_list, depth, key in parent, SerialRef or None
+        source = wrapper.get_raw_object()
+        if refs is not None and source is not None:
+            ref = SerialRef()
+            refs[id(source), depth] = source, ref
+        else:
+            ref = None
+        if isinstance(obj, dict):
+            return [wrapper, iter(obj.items()), False, depth, key, ref]
+        else:
+            return [wrapper, enumerate(obj), True, depth, key, ref]
+
+    @staticmethod
+    def _get_json_key(key) -> str:
+        # converts keys the same way as json.dumps() does
+        if isinstance(key, str):
+            return key
+        elif key is True:
+            return 'true'
+        elif key is False:
+            return 'false'
+        elif key is None:
+            return 'null'
+        elif isinstance(key, (int, float)):
+            return JSON_ENCODER.encode(key)
+        else:
+            raise TypeError(f'keys must be str, int, float, bool or None, not {key.__class__.__name__}')
+
+    @staticmethod
+    def _get_json_pointer(pointer: str, key) -> str:
+        escaped_key = str(key).replace('~', '~0').replace('/', '~1')
+        return f'{pointer}/{escaped_key}'
+
+    @classmethod
+    def _get_with_json_refs(cls, data):
+        """
+        Replaces repeated (shared or cyclic) containers with {"$ref": "<json-pointer to first occurrence>"}.
+        Walks data with explicit stack (in the same order as recursive walk), so depth of data is not limited.
+        """
+        visited = dict()  # id(container) -> pointer to its first occurrence
+        root = list()
+        stack = [(iter([(None, data)]), root, None)]  # items, replaced container, pointer of container
+        while stack:
+            items, replaced, pointer = stack[-1]
+            for k, v in items:
+                v_pointer = '#' if pointer is None else cls._get_json_pointer(pointer, k)
+                child = None
+                if isinstance(v, (dict, list, tuple)):
+                    if id(v) in visited:
+                        v = {JSON_REF_KEY: visited[id(v)]}
+                    else:
+                        visited[id(v)] = v_pointer
+                        if isinstance(v, dict):
+                            child = iter(v.items()), v.__class__(), v_pointer
+                        else:
+                            child = enumerate(v), list(), v_pointer
+                        v = child[1]
+                if isinstance(replaced, dict):
+                    replaced[k] = v
+                else:
+                    replaced.append(v)
+                if child:
+                    stack.append(child)
+                    break
+            else:
+                stack.pop()
+        return root[0]
 
-    def get_yaml(self) -> str:
+    def get_yaml(self, fast: bool = False) -> str:
+        """
+        :param fast: use libyaml C-emitter if it is installed,
+        it does not indent sequences inside mappings like IndentDumper does.
+        """
         data = self.get_serializable_props(ordered=False)
-        return yaml.dump(data, Dumper=IndentDumper, allow_unicode=True, sort_keys=False)
+        return get_serial_backend('yaml', exact=not fast).dumps(data)
+
+    def write_yaml(self, fp: TextIO, fast: bool = False) -> int:
+        """
+        Writes the same text as get_yaml() returns into stream,
+        emitting PyYAML events while walking wrapped data (without building full serializable structure).
+        With use_refs data is walked twice: anchors must be known before the first occurrence of repeated object.
+        :param fp: text stream to write into.
+        :param fast: use libyaml C-emitter if it is installed,
+        it does not indent sequences inside mappings like IndentDumper does.
+        :return: count of written chars.
+        """
+        return write_chunks(fp, self.get_yaml_chunks(fast=fast))
+
+    def get_yaml_chunks(self, fast: bool = False) -> Iterator[str]:
+        # lazily generates parts of the same text as write_yaml() writes
+        stream = ChunkStream()
+        dumper_class = get_serial_backend('yaml', exact=not fast).dumper
+        dumper = dumper_class(stream, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        try:
+            dumper.open()
+            for event in self._get_yaml_events(dumper):
+                dumper.emit(event)
+                if stream.chunks:
+                    yield from stream.pop_chunks()
+            dumper.close()
+            yield from stream.pop_chunks()
+        finally:
+            dumper.dispose()
+
+    def _get_yaml_events(self, dumper: yaml.SafeDumper) -> Iterator:
+        if self.use_refs:
+            anchors = self._get_yaml_anchors()
+            refs = dict()
+        else:
+            anchors, refs = dict(), None
+        yield DocumentStartEvent(explicit=None)
+        is_lists = list()  # for opened containers
+        refs_count = 0
+        for event, key, value in self._get_serial_events(ordered=False, refs=refs):
+            if event == END:
+                is_lists.pop()
+                yield SequenceEndEvent() if value else MappingEndEvent()
+                continue
+            if is_lists and not is_lists[-1]:  # item of mapping
+                yield from self._get_yaml_node_events(dumper, self._get_yaml_node(dumper, key))
+            if event == START:
+                is_list, ref = value
+                anchor = None
+                if ref:
+                    refs_count += 1
+                    anchor = anchors.get(refs_count)
+                    ref.label = anchor
+                is_lists.append(is_list)
+                if is_list:
+                    yield SequenceStartEvent(anchor, dumper.DEFAULT_SEQUENCE_TAG, True, flow_style=False)
+                else:
+                    yield MappingStartEvent(anchor, dumper.DEFAULT_MAPPING_TAG, True, flow_style=False)
+            elif event == REF:
+                yield AliasEvent(value.label)
+            else:  # event == VALUE
+                yield from self._get_yaml_node_events(dumper, self._get_yaml_node(dumper, value))
+        yield DocumentEndEvent(explicit=None)
+
+    def _get_yaml_anchors(self) -> dict:
+        # numbers of repeated objects (in order of their first occurrences) -> names of anchors,
+        # names are generated in order of second occurrences like yaml.serializer.Serializer does
+        anchors = dict()
+        refs_count = 0
+        for event, key, value in self._get_serial_events(ordered=False, refs=dict()):
+            if event == START:
+                _, ref = value
+                if ref:
+                    refs_count += 1
+                    ref.label = refs_count
+            elif event == REF:
+                if value.label not in anchors:
+                    anchors[value.label] = 'id%03d' % (len(anchors) + 1)
+        return anchors
+
+    @staticmethod
+    def _get_yaml_node(dumper: yaml.SafeDumper, value):
+        node = dumper.represent_data(value)
+        dumper.represented_objects, dumper.object_keeper, dumper.alias_key = dict(), list(), None
+        return node
+
+    @classmethod
+    def _get_yaml_node_events(cls, dumper: yaml.SafeDumper, node) -> Iterator:
+        # same as yaml.serializer.Serializer.serialize_node() without anchors
+        if isinstance(node, ScalarNode):
+            detected_tag = dumper.resolve(ScalarNode, node.value, (True, False))
+            default_tag = dumper.resolve(ScalarNode, node.value, (False, True))
+            implicit = (node.tag == detected_tag), (node.tag == default_tag)
+            yield ScalarEvent(None, node.tag, implicit, node.value, style=node.style)
+        elif isinstance(node, SequenceNode):
+            implicit = node.tag == dumper.resolve(SequenceNode, node.value, True)
+            yield SequenceStartEvent(None, node.tag, implicit, flow_style=node.flow_style)
+            for item in node.value:
+                yield from cls._get_yaml_node_events(dumper, item)
+            yield SequenceEndEvent()
+        elif isinstance(node, MappingNode):
+            implicit = node.tag == dumper.resolve(MappingNode, node.value, True)
+            yield MappingStartEvent(None, node.tag, implicit, flow_style=node.flow_style)
+            for k, v in node.value:
+                yield from cls._get_yaml_node_events(dumper, k)
+                yield from cls._get_yaml_node_events(dumper, v)
+            yield MappingEndEvent()
 
     @staticmethod
     def parse_yaml(line, target_class: Class = dict, path: Optional[str] = None) -> CommonWrapper:
-        props = yaml.safe_load(line)
+        props = get_serial_backend('yaml').loads(line)
+        wrapped = CommonWrapper.from_props(props=props, target_class=target_class, path=path)
+        assert isinstance(wrapped, CommonWrapper)
+        return wrapped
+
+    @staticmethod
+    def parse_json(line, target_class: Class = dict, path: Optional[str] = None) -> CommonWrapper:
+        props = get_serial_backend('json').loads(line)
         wrapped = CommonWrapper.from_props(props=props, target_class=target_class, path=path)
         assert isinstance(wrapped, CommonWrapper)
         return wrapped
+
+    @classmethod
+    def parse_yaml_stream(
+            cls,
+            stream: Union[TextIO, str, PathLike],
+            target_class: Class = dict,
+            path: Optional[str] = None,
+            batch_size: Optional[int] = None,
+    ) -> Iterator:
+        """
+        Lazily parses multi-document YAML stream (documents separated by ---), one document at a time.
+        :param stream: file-like object or path to file.
+        :param batch_size: yield lists of (up to) batch_size wrapped objects instead of single objects.
+        """
+        documents = cls._get_parsed_documents(stream, cls._load_yaml_documents)
+        return cls._get_wrapped_documents(documents, target_class=target_class, path=path, batch_size=batch_size)
+
+    @classmethod
+    def parse_jsonl_stream(
+            cls,
+            stream: Union[TextIO, str, PathLike],
+            target_class: Class = dict,
+            path: Optional[str] = None,
+            batch_size: Optional[int] = None,
+    ) -> Iterator:
+        """
+        Lazily parses JSON Lines stream (one JSON-document per line, empty lines are skipped).
+        :param stream: file-like object or path to file.
+        :param batch_size: yield lists of (up to) batch_size wrapped objects instead of single objects.
+        """
+        documents = cls._get_parsed_documents(stream, cls._load_json_lines)
+        return cls._get_wrapped_documents(documents, target_class=target_class, path=path, batch_size=batch_size)
+
+    @staticmethod
+    def _get_parsed_documents(stream: Union[TextIO, str, PathLike], load: Callable) -> Iterator:
+        if isinstance(stream, (str, PathLike)):
+            with open(stream, encoding='utf8') as fp:  # closed when generator is exhausted or closed
+                yield from load(fp)
+        else:
+            yield from load(stream)
+
+    @staticmethod
+    def _load_yaml_documents(fp: TextIO) -> Iterator:
+        return yaml.load_all(fp, Loader=get_serial_backend('yaml').loader)
+
+    @staticmethod
+    def _load_json_lines(fp: TextIO) -> Iterator:
+        loads = get_serial_backend('json').loads
+        for line in fp:
+            if line.strip():
+                yield loads(line)
+
+    @staticmethod
+    def _get_wrapped_documents(
+            documents: Iterable,
+            target_class: Class = dict,
+            path: Optional[str] = None,
+            batch_size: Optional[int] = None,
+    ) -> Iterator:
+        wrapped = (CommonWrapper.from_props(props=i, target_class=target_class, path=path) for i in documents)
+        if batch_size:
+            return get_batches(wrapped, batch_size)
+        else:
+            return wrapped
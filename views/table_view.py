@@ -1,7 +1,7 @@
 from typing import Iterable, Iterator, Union, Optional
 
 from util.types import Array
-from util.functions import is_empty
+from util.functions import is_empty, get_joined_chunks, get_window
 from views.formatted_view import FormattedView
 
 Native = FormattedView
@@ -33,6 +33,13 @@ class TableView(FormattedView):
     def get_body(self) -> Optional[Native]:
         return TableView(self.get_data())
 
+    def get_window(self, offset: int = 0, limit: Optional[int] = None) -> Native:
+        # view of rows from offset to offset + limit with the same columns
+        return self.__class__(get_window(self.get_data(), offset, limit), columns=self.columns)
+
+    def get_page(self, number: int, page_size: int) -> Native:
+        return self.get_window(number * page_size, page_size)
+
     def get_iterable_rows(self, including_title: bool = False) -> Iterator[Iterable]:
         if including_title:
             yield self.get_column_names()
@@ -41,13 +48,16 @@ class TableView(FormattedView):
             yield row
 
     def get_text_lines(self, including_title: bool = True) -> list:
-        lines = list()
+        return list(self._get_text_lines(including_title=including_title))
+
+    def get_text_chunks(self) -> Iterator[str]:
+        return get_joined_chunks(self._get_text_lines(including_title=True))
+
+    def _get_text_lines(self, including_title: bool = True) -> Iterator[str]:
         for row in self.get_iterable_rows(including_title=including_title):
             if row is not None:
                 row = ['-' if c is None else str(c) for c in row]
-                line = '\t'.join(row)
-                lines.append(line)
-        return lines
+                yield '\t'.join(row)
 
     def get_md_lines(self) -> Iterator[str]:
         if self.has_struct():
@@ -81,3 +91,28 @@ class TableView(FormattedView):
                     cell = cell._repr_html_()
                 yield f'<td style="text-align: left;">{cell}</td>'
             yield '</tr>'
+
+
+class StreamingTableView(TableView):
+    """
+    TableView over lazy iterable of rows (i.e. generator over millions of records).
+    Rows are not stored: text, markdown and html are rendered incrementally in constant memory,
+    so view over iterator can be rendered only once.
+    """
+
+    def set_data(self, data: Iterable[Array]):
+        self._data = data
+
+    def get_text_lines(self, including_title: bool = True) -> Iterator[str]:
+        return self._get_text_lines(including_title=including_title)
+
+    def get_html_lines(self) -> Iterator[str]:
+        yield '<table>'
+        if self.has_struct():
+            yield '<thead>'
+            yield from self.get_header().get_html_rows()
+            yield '</thead>'
+        yield '<tbody>'
+        yield from self.get_html_rows()
+        yield '</tbody>'
+        yield '</table>'
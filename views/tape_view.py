@@ -0,0 +1,357 @@
+from typing import Optional, Iterable, Iterator, AsyncIterator
+from array import array
+from copy import copy
+
+from util.ext import HTML, display
+from util.const import INDENT, WRITE_BUFFER_SIZE
+from util.types import PRIMITIVES
+from util.functions import remove_redundant_spacing, get_joined_chunks, get_buffered_chunks, get_split_lines
+from util.aio import aiter_in_thread
+from visual import TagType
+from views.abstract_view import AbstractView
+from views.text_view import TextView
+from views.formatted_view import FormattedView, Tag
+
+Native = AbstractView
+
+# opcodes of tape
+OPEN, CLOSE, STR, VALUE, TEXT_VIEW, LINE, NONE, OBJECT = range(8)
+
+
+class TapeTag:
+    """
+    Interned tag of tape nodes: open/close tags of node prepared for each format
+    and prototype view (without data) for restoring object-based views.
+    """
+    __slots__ = 'prototype', 'html_open', 'html_close', 'html_indent', 'md_open', 'md_close', 'text_open', 'text_close', 'is_list'
+
+    def __init__(self, prototype: FormattedView):
+        self.prototype = prototype
+        if prototype.tag:
+            self.html_open, self.html_close = prototype.get_html_open_tag(), prototype.get_html_close_tag()
+            self.html_indent = INDENT
+        else:
+            self.html_open, self.html_close, self.html_indent = '', '', ''
+        self.md_open, self.md_close = prototype._get_formatted_tags(md=True)
+        self.text_open, self.text_close = prototype._get_formatted_tags(md=False)
+        self.is_list = prototype.get_tag_type() == TagType.List
+
+    def get_key(self) -> tuple:
+        return (
+            type(self.prototype), self.html_open, self.html_close, self.html_indent,
+            self.md_open, self.md_close, self.text_open, self.text_close, self.is_list,
+        )
+
+
+class TapeView(AbstractView):
+    """
+    Flat array-backed equivalent of tree of FormattedView (or SquareView) objects ("render tape"):
+    sequence of opcodes (open node, text, close node) with operands in typed arrays,
+    strings and tags (with styles) are interned, so large trees take few bytes per node.
+    Renders text, markdown and html identical to original views, see from_view() and to_view().
+    """
+
+    def __init__(self):
+        self._ops = array('B')  # opcodes
+        self._args = array('L')  # operands: index of node (OPEN), string (STR, VALUE, LINE) or object (OBJECT)
+        self._node_tags = array('L')  # index of TapeTag by index of node
+        self._node_counts = array('L')  # count of items by index of node
+        self._strings = list()
+        self._string_ids = dict()
+        self._tags = list()
+        self._tag_ids = dict()  # key of TapeTag -> index
+        self._tag_ids_by_tag = dict()  # formatting tag object -> index of TapeTag
+        self._objects = list()  # items which can not be flattened
+        self._open_nodes = list()  # positions of OPEN in _ops while building
+        super().__init__(data=None)
+
+    def get_data(self) -> array:
+        return self._ops
+
+    def set_data(self, data):
+        assert data is None, 'use open(), add() and close() for building tape'
+
+    data = property(get_data, set_data)
+
+    @classmethod
+    def from_view(cls, view: FormattedView) -> Native:
+        tape = cls()
+        if not FormattedView.is_plain(view):
+            raise TypeError(f'can not flatten {view.__class__.__name__}')
+        tape.add(view)
+        return tape
+
+    def to_view(self) -> FormattedView:
+        root = None
+        stack = list()  # items of open nodes
+        for op, arg in zip(self._ops, self._args):
+            if op == OPEN:
+                view = copy(self._tags[self._node_tags[arg]].prototype)
+                if view.tag:
+                    view.tag = copy(view.tag)
+                view.set_data([])
+                if stack:
+                    stack[-1].append(view)
+                else:
+                    root = view
+                stack.append(view.get_data())
+            elif op == CLOSE:
+                stack.pop()
+            elif op == TEXT_VIEW:
+                stack[-1].append(TextView([]))
+            elif op == LINE:
+                stack[-1][-1].get_data().append(self._strings[arg])
+            elif op == OBJECT:
+                stack[-1].append(self._objects[arg])
+            elif op == NONE:
+                stack[-1].append(None)
+            else:  # STR, VALUE
+                stack[-1].append(self._strings[arg])
+        return root
+
+    def get_nodes_count(self) -> int:
+        return len(self._node_tags)
+
+    def get_ops_count(self) -> int:
+        return len(self._ops)
+
+    def _append(self, op: int, arg: int = 0):
+        self._ops.append(op)
+        self._args.append(arg)
+
+    def _get_string_id(self, text: str) -> int:
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(text)
+            self._string_ids[text] = string_id
+        return string_id
+
+    def _get_tag_id(self, prototype: FormattedView) -> int:
+        tape_tag = TapeTag(prototype)
+        key = tape_tag.get_key()
+        tag_id = self._tag_ids.get(key)
+        if tag_id is None:
+            tag_id = len(self._tags)
+            prototype = copy(prototype)
+            prototype.set_data([])
+            tape_tag.prototype = prototype
+            self._tags.append(tape_tag)
+            self._tag_ids[key] = tag_id
+        return tag_id
+
+    def _get_tag_id_by_tag(self, tag: Tag) -> int:
+        # the same tag object gives the same TapeTag, so viewers can reuse tag objects for cheap interning
+        tag_id = self._tag_ids_by_tag.get(tag)
+        if tag_id is None:
+            tag_id = self._get_tag_id(FormattedView([], tag=tag))
+            self._tag_ids_by_tag[tag] = tag_id
+        return tag_id
+
+    def _count_item(self):
+        if self._open_nodes:
+            node_id = self._args[self._open_nodes[-1]]
+            self._node_counts[node_id] += 1
+
+    def open(self, tag: Tag = None):
+        """
+        Starts node of FormattedView with tag, next added items will be its items until close().
+        """
+        self._open_node(self._get_tag_id_by_tag(tag))
+
+    def _open_node(self, tag_id: int):
+        self._count_item()
+        self._open_nodes.append(len(self._ops))
+        self._append(OPEN, len(self._node_tags))
+        self._node_tags.append(tag_id)
+        self._node_counts.append(0)
+
+    def close(self, drop_empty: bool = False):
+        """
+        Finishes last opened node.
+        :param drop_empty: remove node without items (as it was never opened).
+        """
+        position = self._open_nodes.pop()
+        node_id = self._args[position]
+        if drop_empty and not self._node_counts[node_id]:
+            del self._ops[position:], self._args[position:]
+            del self._node_tags[node_id:], self._node_counts[node_id:]
+            if self._open_nodes:
+                self._node_counts[self._args[self._open_nodes[-1]]] -= 1
+        else:
+            self._append(CLOSE)
+
+    def add(self, item):
+        """
+        Adds item (as item of FormattedView), nested FormattedView are flattened.
+        """
+        if FormattedView.is_plain(item):
+            self._add_view(item)
+        else:
+            self._add_item(item)
+
+    def _add_view(self, view: FormattedView):
+        # flattens tree of views with explicit stack
+        self._open_node(self._get_tag_id(view))
+        stack = [iter(view.get_data())]
+        while stack:
+            for i in stack[-1]:
+                if FormattedView.is_plain(i):
+                    self._open_node(self._get_tag_id(i))
+                    stack.append(iter(i.get_data()))
+                    break
+                else:
+                    self._add_item(i)
+            else:
+                stack.pop()
+                self.close()
+
+    def _add_item(self, item):
+        self._count_item()
+        if item is None:
+            self._append(NONE)
+        elif isinstance(item, str):
+            self._append(STR, self._get_string_id(item))
+        elif isinstance(item, PRIMITIVES):
+            self._append(VALUE, self._get_string_id(str(item)))
+        elif type(item) is TextView:
+            self._append(TEXT_VIEW)
+            for line in item.get_text_lines():
+                self._append(LINE, self._get_string_id(line))
+        else:
+            self._objects.append(item)
+            self._append(OBJECT, len(self._objects) - 1)
+
+    def get_tag_type(self) -> Optional[TagType]:
+        if self._ops:
+            return self._tags[self._node_tags[0]].prototype.get_tag_type()
+
+    def get_count(self) -> int:
+        return self._node_counts[0] if self._node_counts else 0
+
+    def _get_formatted_parts(self, md: bool) -> Iterator[str]:
+        """
+        Generates parts of markdown (or text) the same as FormattedView._get_formatted_parts() of original view.
+        """
+        get_indented = FormattedView._get_indented
+        strings, objects, tags, node_tags = self._strings, self._objects, self._tags, self._node_tags
+        stack = list()  # indent, close tag
+        indent = ''
+        for op, arg in zip(self._ops, self._args):
+            if op == OPEN:
+                tag = tags[node_tags[arg]]
+                if stack and tag.is_list:
+                    indent += INDENT
+                open_tag, close_tag = (tag.md_open, tag.md_close) if md else (tag.text_open, tag.text_close)
+                if open_tag:
+                    yield get_indented(open_tag, indent)
+                stack.append((indent, close_tag))
+            elif op == CLOSE:
+                indent, close_tag = stack.pop()
+                if close_tag:
+                    yield get_indented(close_tag, indent)
+                indent = stack[-1][0] if stack else ''
+            elif op == STR or op == LINE or op == VALUE:
+                yield get_indented(strings[arg], indent)
+            elif op == OBJECT:
+                for part in FormattedView([objects[arg]])._get_formatted_parts(md):
+                    yield get_indented(part, indent)
+
+    def _get_text_parts(self) -> Iterator[str]:
+        return self._get_formatted_parts(md=False)
+
+    def _get_md_parts(self) -> Iterator[str]:
+        return self._get_formatted_parts(md=True)
+
+    def get_text_lines(self) -> Iterable[str]:
+        one_line = ''.join(self._get_text_parts())
+        one_line = remove_redundant_spacing(one_line)
+        yield from one_line.split('\n')
+
+    def get_md_lines(self) -> Iterable[str]:
+        yield from get_split_lines(self._get_md_parts())
+
+    def get_html_lines(self) -> Iterable[str]:
+        """
+        Generates lines of html the same as FormattedView.get_html_lines() of original view:
+        node with less than 2 items is written as one line (its items are collected in buffer),
+        otherwise items are written line by line with accumulated indent.
+        """
+        strings, objects, tags, node_tags = self._strings, self._objects, self._tags, self._node_tags
+        stack = list()  # tag, is one-line node, buffer and prefix of parent
+        buffer, prefix = None, ''  # buffer of current one-line node (if any), prefix of current lines
+        for op, arg in zip(self._ops, self._args):
+            lines, target = (), (buffer, prefix)  # lines of node are written by its parent
+            if op == OPEN:
+                tag = tags[node_tags[arg]]
+                is_one_line = self._node_counts[arg] < 2
+                stack.append((tag, is_one_line, buffer, prefix))
+                if is_one_line:
+                    buffer, prefix = list(), ''
+                else:
+                    if tag.html_open:
+                        lines = (tag.html_open, )
+                    prefix += tag.html_indent
+            elif op == CLOSE:
+                tag, is_one_line, parent_buffer, parent_prefix = stack.pop()
+                if is_one_line:
+                    lines = (tag.html_open + ''.join(buffer) + tag.html_close, )
+                elif tag.html_close:
+                    lines = (tag.html_close, )
+                buffer, prefix = parent_buffer, parent_prefix
+                target = (buffer, prefix)
+            elif op == STR or op == VALUE:
+                lines = (strings[arg], )
+            elif op == LINE:
+                lines = (f'{strings[arg]}<br>', )
+            elif op == OBJECT:
+                lines = FormattedView([objects[arg]])._get_html_parts()
+            line_buffer, line_prefix = target
+            for line in lines:
+                if line_buffer is None:
+                    yield line_prefix + line
+                else:
+                    line_buffer.append(line_prefix + line)
+
+    def get_text(self) -> str:
+        return '\n'.join(self.get_text_lines())
+
+    def get_text_chunks(self) -> Iterator[str]:
+        return get_joined_chunks(self.get_text_lines())
+
+    def get_html_chunks(self) -> Iterator[str]:
+        return get_joined_chunks(self.get_html_lines())
+
+    def get_md_chunks(self) -> Iterator[str]:
+        return get_joined_chunks(self.get_md_lines())
+
+    def aiter_text(self, buffer_size: int = WRITE_BUFFER_SIZE) -> AsyncIterator[str]:
+        return aiter_in_thread(lambda: get_buffered_chunks(self.get_text_chunks(), buffer_size))
+
+    def aiter_html(self, buffer_size: int = WRITE_BUFFER_SIZE) -> AsyncIterator[str]:
+        return aiter_in_thread(lambda: get_buffered_chunks(self.get_html_chunks(), buffer_size))
+
+    def aiter_md(self, buffer_size: int = WRITE_BUFFER_SIZE) -> AsyncIterator[str]:
+        return aiter_in_thread(lambda: get_buffered_chunks(self.get_md_chunks(), buffer_size))
+
+    def show(self):
+        if HTML:
+            layout = HTML('\n'.join(self.get_html_lines()))
+        else:
+            layout = self.get_text()
+        return display(layout)
+
+    def _repr_html_(self):
+        return '\n'.join(self.get_html_lines())
+
+    def _repr_markdown_(self):
+        return '\n'.join(self.get_md_lines())
+
+    def get_repr(self):
+        return f'{self.__class__.__name__}(nodes={self.get_nodes_count()}, ops={self.get_ops_count()})'
+
+    def __repr__(self):
+        return self.get_repr()
+
+    def __str__(self):
+        return self.get_text()
@@ -1,6 +1,8 @@
-from typing import Iterable, Optional
+from typing import Iterable, Iterator, AsyncIterator, Optional
 
-from util.functions import crop
+from util.const import WRITE_BUFFER_SIZE
+from util.functions import crop, get_joined_chunks, get_buffered_chunks
+from util.aio import aiter_in_thread
 from views.abstract_view import AbstractView
 
 Native = AbstractView
@@ -35,6 +37,15 @@ class TextView(AbstractView):
     def get_text(self) -> str:
         return '\n'.join(self.get_text_lines())
 
+    def get_text_chunks(self) -> Iterator[str]:
+        return get_joined_chunks(self.get_text_lines())
+
+    def aiter_text(self, buffer_size: int = WRITE_BUFFER_SIZE) -> AsyncIterator[str]:
+        """
+        Async iterator over parts of get_text(), rendered in thread, yields control to event loop between parts.
+        """
+        return aiter_in_thread(lambda: get_buffered_chunks(self.get_text_chunks(), buffer_size))
+
     def _get_modified_view(self, data: Iterable, inplace: bool):
         if inplace:
             self.data = data
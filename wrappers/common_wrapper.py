@@ -1,28 +1,58 @@
 from typing import Optional, Iterable, Union, Any
 from collections import OrderedDict
+from functools import partial
+from enum import Enum
+import sys
 
 from util.const import PATH_DELIMITER, SHORT_LINE_LEN
 from util.types import Class, PRIMITIVES, Array, ARRAY_TYPES
 from util.functions import get_tech_name, get_array_str, remove_empty_values_from_dict, get_hint, get_repr
+from util.linked_path import LinkedPath
+from util.lazy_props import LazyProps
+from util.prefetch import Prefetcher
+from util.aio import resolve_awaitable
+from util.type_handlers import (
+    TypeHandler, PropsHandler, MISSING,
+    get_type_handler, register_type_handler, get_class_layout, get_accessor,
+)
 from abstract.common_abstract import CommonAbstract as Abstract
 from interfaces.wrapper_interface import WrapperInterface as Interface
 from interfaces.view_interface import ViewInterface as View
 from interfaces.viewer_interface import ViewerInterface as Viewer
 
 Native = Union[Abstract, Interface]
+Path = Union[Array, str, LinkedPath, None]
 
 DEFAULT_PROPS = 'class', 'path'
 
 
+class SerializationEngine(Enum):
+    Recursive = 'recursive'
+    Iterative = 'iterative'
+
+
 class CommonWrapper(Abstract, Interface):
+    # bases are not slotted (to keep their subclasses unchanged), but __dict__ of wrapper is never allocated
+    __slots__ = '_obj', '_path', '_root', '_path_index', '_children'
+
     _default_viewer = None
+    _serialization_engine = SerializationEngine.Recursive
+    _prefetcher = None
 
-    def __init__(self, obj, path: Optional[list] = None, root: Optional[Native] = None):
+    def __init__(self, obj, path: Path = None, root: Optional[Native] = None):
         self._obj = obj
-        self._path = path or []
+        self._path = LinkedPath.from_list(path)  # shared with parent, None for empty path
         self._root = root  # empty root is self
+        self._path_index = None  # tuple(path) -> (raw, wrapped), see enable_path_index()
+        self._children = None  # name -> interned child wrapper, see enable_child_interning()
         if hasattr(obj, 'tech_name') and not path:
-            self._path = [obj.tech_name]
+            self._path = LinkedPath(obj.tech_name)
+
+    def _get_init_kwargs(self, skip_none: bool = True) -> dict:
+        init_kwargs = dict(obj=self._obj, path=self._path, root=self._root)
+        if skip_none:
+            init_kwargs = {k: v for k, v in init_kwargs.items() if v is not None}
+        return init_kwargs
 
     def get_raw_object(self) -> Any:
         return self._obj
@@ -39,6 +69,9 @@ class CommonWrapper(Abstract, Interface):
         else:
             return obj
 
+    def get_type_handler(self) -> TypeHandler:
+        return get_type_handler(type(self._obj))
+
     def get_root(self) -> Native:
         if self._root:
             return self._root
@@ -46,39 +79,47 @@ class CommonWrapper(Abstract, Interface):
             return self
 
     def get_path(self) -> list:
+        if self._path is None:
+            return []
+        return self._path.get_list()
+
+    def get_linked_path(self) -> Optional[LinkedPath]:
         return self._path
 
+    def _get_child_path(self, name) -> LinkedPath:
+        return LinkedPath(name, parent=self._path)
+
     def is_path_valid(self) -> bool:
         return self == self.get_root().get_node(self.get_path())
 
     def get_tech_name(self) -> str:
         obj = self.get_raw_object()
         tech_name = get_tech_name(obj)
-        path = self.get_path()
+        path = self._path
         if tech_name:
             return tech_name
         elif path:
-            return '.'.join(map(str, path))
+            return path.get_str()
         else:
             return str(self)
 
     def get_name_or_str(self) -> str:
         obj = self.get_raw_object()
-        if isinstance(obj, PRIMITIVES):
-            return str(obj)
-        elif isinstance(obj, ARRAY_TYPES):
+        handler = self.get_type_handler()
+        if handler.is_array:
             return get_array_str(obj)
-        elif hasattr(obj, 'get_name_or_str'):
-            return obj.get_name_or_str()
-        else:
+        name = handler.get_name_or_str(obj)
+        if name is None:
             return self.get_tech_name()
+        else:
+            return name
 
     @classmethod
-    def wrap(cls, obj: Any, path: Optional[list] = None) -> Native:
+    def wrap(cls, obj: Any, path: Path = None) -> Native:
         return CommonWrapper(obj, path=path)
 
     @classmethod
-    def from_props(cls, props: dict, target_class: Class = dict, path: Optional[list] = None) -> Native:
+    def from_props(cls, props: dict, target_class: Class = dict, path: Path = None) -> Native:
         obj = target_class(**props)
         return cls.wrap(obj, path=path)
 
@@ -132,56 +173,84 @@ class CommonWrapper(Abstract, Interface):
             including_protected: bool = False,
             add: Optional[Iterable] = None,
             skip_empty: bool = False,
-    ) -> OrderedDict:
+            lazy: bool = False,
+    ) -> Union[OrderedDict, LazyProps]:
+        """
+        :param lazy: return LazyProps evaluating each value on first access (skip_empty evaluates all values),
+        values can be evaluated concurrently in background by prefetch_props().
+        """
         obj = self.get_raw_object()
-        props = OrderedDict()
+        handler = self.get_type_handler()
         if add is None:
-            add = [] if isinstance(obj, dict) else DEFAULT_PROPS
-        for i in add:
-            props[i] = self.get_property(i)
-
-        if hasattr(obj, 'get_props'):  # isinstance(obj, Entity)
-            if isinstance(obj, CommonWrapper):
-                props.update(obj.get_props(add=[]))
-            else:
-                props.update(obj.get_props())
-        elif isinstance(obj, dict):
-            props.update(obj)
-        elif isinstance(obj, ARRAY_TYPES):
-            for n, i in enumerate(obj):
-                props[n] = i
-        elif hasattr(obj, '__dict__'):
-            for i in self.get_raw_property_names(including_protected=including_protected):
-                props[i] = getattr(obj, i)
+            add = [] if handler.is_dict else DEFAULT_PROPS
+        if lazy:
+            props = LazyProps()
+            for i in add:
+                props.set_getter(i, partial(self.get_property, i))
+            props.update_getters(handler.get_lazy_props(obj, self, including_protected=including_protected))
         else:
-            props['data'] = obj
+            props = OrderedDict()
+            for i in add:
+                props[i] = self.get_property(i)
+            props.update(handler.get_props(obj, self, including_protected=including_protected))
 
         if skip_empty:
             props = remove_empty_values_from_dict(props)
         return props
 
+    def prefetch_props(self, props: LazyProps, keys: Optional[Iterable] = None) -> LazyProps:
+        """
+        Starts concurrent evaluation of lazy props of this object if prefetcher is set (see set_prefetcher()).
+        :param keys: props which will be shown, other getters are not called; all props if None.
+        """
+        if self._prefetcher:
+            self._prefetcher.prefetch(props, owner=self.get_raw_object().__class__.__name__, keys=keys)
+        return props
+
+    @classmethod
+    def set_prefetcher(cls, prefetcher: Optional[Prefetcher]):
+        """
+        Enables (or disables with None) concurrent evaluation of lazy props shown by viewers, see prefetch_props().
+        :param prefetcher: Prefetcher with thread pool, timeout per property and PropertyStats.
+        """
+        cls._prefetcher = prefetcher
+
+    @classmethod
+    def set_serialization_engine(cls, engine: Union[SerializationEngine, str]):
+        """
+        Selects implementation of get_serializable_props() for all wrappers:
+        recursive (default) or iterative (with explicit stack, for deeply nested structures).
+        Both engines return the same result.
+        """
+        cls._serialization_engine = SerializationEngine(engine)
+
     def get_serializable_props(
             self,
             depth: Optional[int] = None,
             use_tech_names: bool = False,
             skip_empty: bool = False,
             ordered: bool = True,
+            refs: Optional[dict] = None,
     ):
-        obj = self.get_raw_object()
-        if isinstance(obj, PRIMITIVES):  # bool, int, float, str
-            return obj
-        if isinstance(obj, type):
-            return repr(obj)
-        if depth == 0:
-            return self.get_name_or_str()
-        if not isinstance(obj, ARRAY_TYPES + (set, dict)):
-            obj = self.get_props(including_protected=False, add=['class'], skip_empty=skip_empty)
+        if self._serialization_engine == SerializationEngine.Iterative:
+            return self._get_serializable_props_iteratively(
+                depth=depth,
+                use_tech_names=use_tech_names,
+                skip_empty=skip_empty,
+                ordered=ordered,
+                refs=refs,
+            )
+        serializable, obj = self._get_serializable_leaf_or_items(depth=depth, skip_empty=skip_empty, refs=refs)
+        if obj is MISSING:
+            return serializable
         return self._get_serializable(
             obj,
             depth=depth,
             use_tech_names=use_tech_names,
             skip_empty=skip_empty,
             ordered=ordered,
+            refs=refs,
+            source=self.get_raw_object(),
         )
 
     def _get_serializable(
@@ -191,37 +260,150 @@ class CommonWrapper(Abstract, Interface):
             use_tech_names: bool = False,
             skip_empty: bool = False,
             ordered: bool = True,
+            refs: Optional[dict] = None,
+            source: Any = MISSING,
     ):
-        if isinstance(obj, dict):
-            serializable_props = OrderedDict() if ordered else dict()
-            items = obj.items()
-            is_list = False
-        elif isinstance(obj, ARRAY_TYPES + (set, )):
-            serializable_props = list()
-            is_list = True
-            items = enumerate(obj)
-        else:
-            raise TypeError(f'expected dict or array, got {obj} as {type(obj)}')
-
+        serializable_props, items, is_list = self._start_serializable(obj, depth, ordered=ordered, refs=refs, source=source)
         for k, v in items:
-            v_name = get_tech_name(v) if use_tech_names else None
-            if v_name is not None:
-                v_serializable = v_name
-            else:
-                if not isinstance(v, CommonWrapper):
-                    v = CommonWrapper.wrap(v, path=self.get_path() + [k])
+            v_serializable, v = self._get_serializable_item(k, v, use_tech_names=use_tech_names)
+            if v_serializable is MISSING:
                 v_depth = depth - 1 if depth is not None else None
                 v_serializable = v.get_serializable_props(
                     depth=v_depth,
                     use_tech_names=use_tech_names,
                     skip_empty=skip_empty,
                     ordered=ordered,
+                    refs=refs,
                 )
             if is_list:
                 serializable_props.append(v_serializable)
             else:  # is dict
                 serializable_props[k] = v_serializable
-        if is_list:
+        return self._finish_serializable(obj, serializable_props, is_list=is_list, refs=refs)
+
+    def _get_serializable_props_iteratively(
+            self,
+            depth: Optional[int] = None,
+            use_tech_names: bool = False,
+            skip_empty: bool = False,
+            ordered: bool = True,
+            refs: Optional[dict] = None,
+    ):
+        serializable, obj = self._get_serializable_leaf_or_items(depth=depth, skip_empty=skip_empty, refs=refs)
+        if obj is MISSING:
+            return serializable
+        container, items, is_list = self._start_serializable(obj, depth, ordered, refs, source=self.get_raw_object())
+        stack = [(self, obj, container, items, is_list, depth, None)]  # key of root in parent container is None
+        ancestors = {id(self.get_raw_object())}  # unlimited depth only
+        while True:
+            wrapper, obj, container, items, is_list, depth, key = stack[-1]
+            v_depth = depth - 1 if depth is not None else None
+            child = None
+            for k, v in items:  # items is iterator, so it continues from the same position after child is done
+                v_serializable, v = wrapper._get_serializable_item(k, v, use_tech_names=use_tech_names)
+                if v_serializable is MISSING:
+                    if type(v).get_serializable_props is not CommonWrapper.get_serializable_props:  # customized
+                        v_serializable = v.get_serializable_props(v_depth, use_tech_names, skip_empty, ordered, refs)
+                    else:
+                        v_serializable, v_obj = v._get_serializable_leaf_or_items(v_depth, skip_empty, refs)
+                        if v_obj is not MISSING:
+                            v_source = v.get_raw_object()
+                            if v_depth is None:
+                                self._check_not_circular(v_source, ancestors)
+                            v_container, v_items, v_is_list = v._start_serializable(
+                                v_obj, v_depth, ordered, refs, source=v_source,
+                            )
+                            child = v, v_obj, v_container, v_items, v_is_list, v_depth, k
+                            break
+                if is_list:
+                    container.append(v_serializable)
+                else:  # is dict
+                    container[k] = v_serializable
+            if child:
+                stack.append(child)
+                continue
+            stack.pop()
+            ancestors.discard(id(wrapper.get_raw_object()))
+            serializable = wrapper._finish_serializable(obj, container, is_list=is_list, refs=refs)
+            if not stack:
+                return serializable
+            _, _, parent_container, _, parent_is_list, _, _ = stack[-1]
+            if parent_is_list:
+                parent_container.append(serializable)
+            else:
+                parent_container[key] = serializable
+
+    @staticmethod
+    def _check_not_circular(source: Any, ancestors: set):
+        # explicit stack would grow infinitely instead of RecursionError, so cycles are detected like json.dumps() does
+        if id(source) in ancestors:
+            raise ValueError('Circular reference detected')
+        ancestors.add(id(source))
+
+    def _get_serializable_leaf_or_items(
+            self,
+            depth: Optional[int] = None,
+            skip_empty: bool = False,
+            refs: Optional[dict] = None,
+    ) -> tuple:
+        # returns (serializable, MISSING) for leaf nodes or (MISSING, dict or array) for nodes to serialize item-wise
+        obj = self.get_raw_object()
+        handler = self.get_type_handler()
+        if handler.is_primitive:  # bool, int, float, str
+            return obj, MISSING
+        if handler.is_class:
+            return repr(obj), MISSING
+        if depth == 0:
+            return self.get_name_or_str(), MISSING
+        if refs is not None and obj is not None:  # repeated (or cyclic) objects will be serialized once
+            ref_key = id(obj), depth
+            if ref_key in refs:
+                _, serialized = refs[ref_key]
+                return serialized, MISSING
+        if not handler.is_container():
+            obj = self.get_props(including_protected=False, add=['class'], skip_empty=skip_empty)
+        return MISSING, obj
+
+    @staticmethod
+    def _start_serializable(
+            obj: Iterable,
+            depth: Optional[int],
+            ordered: bool = True,
+            refs: Optional[dict] = None,
+            source: Any = MISSING,
+    ) -> tuple:
+        handler = get_type_handler(type(obj))
+        if handler.is_dict:
+            serializable_props = OrderedDict() if ordered else dict()
+            items = iter(obj.items())
+            is_list = False
+        elif handler.is_array or handler.is_set:
+            serializable_props = list()
+            is_list = True
+            items = enumerate(obj)
+        else:
+            raise TypeError(f'expected dict or array, got {obj} as {type(obj)}')
+        if refs is not None and source is not None:
+            if source is MISSING:
+                source = obj
+            # register container before its items to make cyclic links point to it,
+            # source is kept in refs to prevent reusing its id by other objects
+            refs[id(source), depth] = source, serializable_props
+        return serializable_props, items, is_list
+
+    def _get_serializable_item(self, key, value, use_tech_names: bool = False) -> tuple:
+        # returns (tech_name, value) if tech name used, otherwise (MISSING, wrapped value)
+        value = resolve_awaitable(value)
+        v_name = get_tech_name(value) if use_tech_names else None
+        if v_name is not None:
+            return v_name, value
+        if not isinstance(value, CommonWrapper):
+            value = CommonWrapper.wrap(value, path=self._get_child_path(key))
+        return MISSING, value
+
+    @staticmethod
+    def _finish_serializable(obj: Iterable, serializable_props, is_list: bool, refs: Optional[dict] = None):
+        if is_list and refs is None:  # registered list can be already linked, so it is not converted
             if not isinstance(obj, (list, set)):  # list is default, set is not serializable
                 cls = obj.__class__
                 serializable_props = cls(serializable_props)
@@ -257,6 +439,9 @@ class CommonWrapper(Abstract, Interface):
 
     def get_attribute_names(self, including_protected: bool = False) -> Iterable[str]:
         obj = self.get_raw_object()
+        layout = get_class_layout(type(obj))
+        if layout is not None:
+            return layout.get_attribute_names(obj, including_protected=including_protected)
         try:
             names = obj.__dir__()
         except TypeError:  # obj is Class
@@ -264,9 +449,7 @@ class CommonWrapper(Abstract, Interface):
         if including_protected:
             return names
         else:
-            for n in names:
-                if not n.startswith('_'):
-                    yield n
+            return [n for n in names if not n.startswith('_')]
 
     def get_raw_property_names(self, including_protected: bool = False) -> list:
         obj = self.get_raw_object()
@@ -278,42 +461,36 @@ class CommonWrapper(Abstract, Interface):
                 for i in vars(obj):
                     if not i.startswith('_'):
                         property_names.append(i)
-        for i in self.get_attribute_names(including_protected=including_protected):
-            if hasattr(obj.__class__, i):
-                attr = getattr(obj.__class__, i)
-                if isinstance(attr, property):
-                    property_names.append(i)
+        layout = get_class_layout(type(obj))
+        if layout is not None:
+            property_names += layout.get_property_names(including_protected=including_protected)
+        else:
+            for i in self.get_attribute_names(including_protected=including_protected):
+                if hasattr(obj.__class__, i):
+                    attr = getattr(obj.__class__, i)
+                    if isinstance(attr, property):
+                        property_names.append(i)
         return property_names
 
     def get_method_names(self, including_protected: bool = False) -> Iterable[str]:
-        prop_names = self.get_props(add=[]).keys()
+        obj = self.get_raw_object()
+        prop_names = set(self.get_type_handler().get_prop_names(obj, self))
         for name in self.get_attribute_names(including_protected):
             if name not in prop_names:
                 yield name
 
     def get_raw_property(self, name: str):
+        # awaitable values are awaited inside async rendering, see util.aio
+        return resolve_awaitable(self._get_raw_property(name))
+
+    def _get_raw_property(self, name: str):
         obj = self.get_raw_object()
-        if isinstance(obj, dict):
-            if name in obj:
-                return obj[name]
-        elif isinstance(obj, ARRAY_TYPES):
-            if isinstance(name, str):
-                if name.isnumeric():
-                    name = int(name)
-            if isinstance(name, int):
-                return obj[name]
-            else:
-                for i in obj:
-                    if hasattr(i, 'tech_name'):
-                        if i.tech_name == name:
-                            return i
-                    wrapped_i = CommonWrapper(i)
-                    if hasattr(wrapped_i, 'get_name'):
-                        if wrapped_i.get_name() == name:
-                            return i
+        item = self.get_type_handler().get_item(obj, name)
+        if item is not MISSING:
+            return item
         if name == 'data' and not hasattr(obj, 'data'):
             return obj
-        elif [name] == self.get_path():
+        elif self._path is not None and len(self._path) == 1 and self._path.get_name() == name:
             return obj
         else:
             if hasattr(obj, name):
@@ -336,12 +513,36 @@ class CommonWrapper(Abstract, Interface):
 
     def get_wrapped_property(self, name: str):
         prop = self.get_raw_property(name)
+        return self._get_wrapped_child(name, prop)
+
+    def _get_wrapped_child(self, name, prop) -> Native:
         if isinstance(prop, CommonWrapper):
             return prop
-        else:
-            path = self.get_path() + [name]
-            root = self.get_root()
-            return CommonWrapper(prop, path=path, root=root)
+        children = self._children
+        if children is not None:
+            child = children.get(name)
+            if child is not None and child._obj is prop:
+                return child
+        child = CommonWrapper(prop, path=self._get_child_path(name), root=self.get_root())
+        if children is not None:
+            child._children = dict()
+            children[name] = child
+        return child
+
+    def enable_child_interning(self):
+        """
+        Enables caching of child wrappers in this wrapper and its descendants,
+        so the same property resolves to the same wrapper instance (while raw property is the same object).
+        Cached wrappers are kept until disable_child_interning() called.
+        """
+        if self._children is None:
+            self._children = dict()
+
+    def disable_child_interning(self):
+        self._children = None
+
+    def has_child_interning(self) -> bool:
+        return self._children is not None
 
     def get_property(self, name: str, wrapped: bool = True):
         if wrapped:
@@ -354,6 +555,9 @@ class CommonWrapper(Abstract, Interface):
             return self
         elif isinstance(path, str):
             path = path.split(PATH_DELIMITER)
+        if self._path_index is not None:
+            raw, wrapped_node = self._get_indexed_node(tuple(path))
+            return wrapped_node if wrapped else raw
         path_len = len(path)
         if path_len == 0:
             return self
@@ -364,6 +568,91 @@ class CommonWrapper(Abstract, Interface):
             assert isinstance(prop, CommonWrapper)
             return prop.get_node(path[1:], wrapped=wrapped)
 
+    def get_raw_node(self, path: Union[Array, str]) -> Any:
+        """
+        Returns the same value as get_node(path, wrapped=False), faster for repeated lookups of the same names
+        in objects of the same classes (i.e. columns of table): each step uses accessor compiled once per class and name
+        (see TypeHandler.get_accessor()) and intermediate nodes are not wrapped.
+        """
+        if isinstance(path, str):
+            path = path.split(PATH_DELIMITER) if path else []
+        if self._path_index is not None:
+            return self.get_node(path, wrapped=False)
+        own_path = self._path
+        own_path_len = len(own_path) if own_path is not None else 0
+        value = self.get_raw_object()
+        for n, name in enumerate(path):
+            node_name = path[n - 1] if n else (own_path.get_name() if own_path is not None else None)
+            is_node_name = own_path_len + n == 1 and node_name == name  # node returns itself, see _get_raw_property()
+            accessor = get_accessor(value.__class__, name)
+            if accessor is None or is_node_name:
+                item = MISSING
+            else:
+                item = accessor(value)
+            if item is MISSING:  # resolve rest of path by wrappers
+                node = self.get_node(path[:n]) if n else self
+                return node.get_node(path[n:], wrapped=False)
+            value = resolve_awaitable(item)
+        return value
+
+    def enable_path_index(self):
+        """
+        Enables caching of nodes resolved by get_node() (and is_path_valid() of descendants if self is root).
+        Index is filled lazily, so repeated lookups of the same path take constant time.
+        Call invalidate_path_index() after changing objects inside the wrapped structure.
+        """
+        if self._path_index is None:
+            self._path_index = dict()
+
+    def disable_path_index(self):
+        self._path_index = None
+
+    def has_path_index(self) -> bool:
+        return self._path_index is not None
+
+    def invalidate_path_index(self, path: Union[Array, str, None] = None):
+        if self._path_index is None:
+            return
+        if path is None:
+            self._path_index.clear()
+        else:
+            if isinstance(path, str):
+                path = path.split(PATH_DELIMITER)
+            prefix = tuple(path)
+            prefix_len = len(prefix)
+            for key in [k for k in self._path_index if k[:prefix_len] == prefix]:
+                self._path_index.pop(key)
+
+    def get_path_index_size(self) -> int:
+        return len(self._path_index or {})
+
+    def get_path_index_memory(self) -> int:
+        """
+        Returns approximate size of path index in bytes, including keys and cached wrappers (excluding raw objects).
+        """
+        if self._path_index is None:
+            return 0
+        total = sys.getsizeof(self._path_index)
+        for key, (raw, wrapped) in self._path_index.items():
+            total += sys.getsizeof(key) + sys.getsizeof((raw, wrapped))
+            if wrapped is not raw:
+                total += sys.getsizeof(wrapped) + sys.getsizeof(wrapped.get_linked_path())
+        return total
+
+    def _get_indexed_node(self, path: tuple) -> tuple:
+        entry = self._path_index.get(path)
+        if entry is None:
+            if len(path) == 1:
+                parent = self
+            else:
+                _, parent = self._get_indexed_node(path[:-1])
+                assert isinstance(parent, CommonWrapper)
+            name = path[-1]
+            raw = parent.get_raw_property(name)
+            entry = raw, parent._get_wrapped_child(name, raw)
+            self._path_index[path] = entry
+        return entry
+
     def __str__(self):
         cls = self.__class__.__name__
         obj = self.get_raw_object()
@@ -374,6 +663,10 @@ class CommonWrapper(Abstract, Interface):
         raw_other = self._get_raw_object(other)
         return raw_self == raw_other
 
+    def __hash__(self):
+        # consistent with __eq__(): wrapper is hashable only if wrapped object is hashable (raises TypeError otherwise)
+        return hash(self.get_raw_object())
+
     def get_view(self, viewer: Optional[Viewer] = None) -> View:
         if not viewer:
             viewer = self._default_viewer
@@ -390,3 +683,14 @@ class CommonWrapper(Abstract, Interface):
             viewer.print(self)
         else:
             raise TypeError(f'provided viewer must be an instance of TextViewer, got {viewer}')
+
+
+class WrapperHandler(PropsHandler):
+    def get_props(self, obj: CommonWrapper, wrapper, including_protected: bool = False) -> dict:
+        return obj.get_props(add=[])
+
+    def get_lazy_props(self, obj: CommonWrapper, wrapper, including_protected: bool = False) -> LazyProps:
+        return obj.get_props(add=[], lazy=True)
+
+
+register_type_handler(CommonWrapper, WrapperHandler())